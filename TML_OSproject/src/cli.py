@@ -0,0 +1,269 @@
+import sys
+import os
+import argparse
+import json
+import logging
+import subprocess
+import time
+
+# Ensure src is in path if run directly (python src/cli.py)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+# Headless entry point. Only the core modules are imported here; nothing from
+# src.ui (tkinter / ttkbootstrap) is ever pulled in.
+
+# Fresh-interpreter import budget for the headless core (engine + monitor).
+# TML_IMPORT_BUDGET_MS overrides it (e.g. for slower CI machines).
+IMPORT_BUDGET_MS = float(os.environ.get("TML_IMPORT_BUDGET_MS", 60.0))
+CORE_MODULES = ("src.core.engine", "src.core.monitor")
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+def _print(data, as_json):
+    if as_json:
+        print(json.dumps(data, indent=2, default=str))
+    else:
+        for k, v in data.items():
+            print(f"{k:>18}: {v}")
+
+
+def cmd_run(args):
+    from src.core.engine import get_engine
+
+    engine = get_engine()
+    engine.set_gc_mode(args.gc_mode)
+    engine.resize_pool(args.workers)
+    start = time.monotonic()
+    engine.fire_workload(task_count=args.tasks, type=args.type, priority=PRIORITIES[args.priority])
+    finished = engine.wait_until_idle(timeout=args.timeout)
+    elapsed = time.monotonic() - start
+
+    stats = engine.get_stats()
+    stats["elapsed_s"] = round(elapsed, 3)
+    stats["throughput_per_s"] = round(stats["total_completed"] / elapsed, 2) if elapsed > 0 else 0.0
+    stats["timed_out"] = not finished
+    engine.shutdown()
+    _print(stats, args.json)
+    return 0 if finished else 1
+
+
+def cmd_stats(args):
+    from src.core.monitor import get_monitor
+
+    monitor = get_monitor()
+    monitor.start()
+    monitor.request_processes()
+    # The first CPU sample needs one full interval to be meaningful
+    time.sleep(args.wait)
+    # Process CPU % comes from the difference between two scans (the first only
+    # primes each process's counters), so make sure a second scan has run
+    deadline = time.monotonic() + 5.0
+    while monitor.get_overhead()["samples"]["processes"] < 2 and time.monotonic() < deadline:
+        monitor.request_processes()
+        time.sleep(0.05)
+    stats = monitor.get_stats()
+    monitor.stop()
+    stats["processes"] = stats["processes"][:args.top]
+    if args.json:
+        _print(stats, True)
+    else:
+        procs = stats.pop("processes")
+        _print(stats, False)
+        print()
+        print(f"{'PID':>8} {'CPU %':>7} {'RAM (MB)':>9} {'Threads':>8}  Name")
+        for p in procs:
+            print(f"{p['pid']:>8} {p['cpu_percent']:>7.1f} {p['memory_mb']:>9.1f} {p.get('num_threads', 0):>8}  {p['name']}")
+    return 0
+
+
+def cmd_serve(args):
+    from src.core.engine import get_engine
+    from src.core.monitor import get_monitor
+    from src.core.exporter import MetricsExporter
+
+    if args.workers:
+        engine = get_engine()
+        engine.set_gc_mode(args.gc_mode)
+        engine.resize_pool(args.workers)
+    monitor = get_monitor()
+    monitor.start()
+    exporter = MetricsExporter(host=args.host, port=args.port, refresh=args.refresh, monitor=monitor)
+    exporter.start()
+    print(f"Serving metrics on http://{exporter.host}:{exporter.port}/metrics (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exporter.stop()
+        monitor.stop()
+    return 0
+
+
+def cmd_history(args):
+    from src.core.timeseries import TimeSeriesStore
+
+    try:
+        store = TimeSeriesStore.open_existing(args.file)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.series not in store.series:
+        print(f"Error: {args.file} has no '{args.series}' series", file=sys.stderr)
+        store.close()
+        return 1
+    start = time.time() - args.minutes * 60
+    points = store.query(args.series, start, max_points=args.points)
+    store.close()
+    if args.json:
+        print(json.dumps([{"t": t, "min": lo, "max": hi, "avg": avg} for t, lo, hi, avg in points], indent=2))
+    else:
+        print(f"{'Time':>19} {'Min':>9} {'Max':>9} {'Avg':>9}")
+        for t, lo, hi, avg in points:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))
+            print(f"{stamp:>19} {lo:>9.2f} {hi:>9.2f} {avg:>9.2f}")
+    return 0
+
+
+def cmd_loadgen(args):
+    from src.core.engine import get_engine
+    from src.core.loadgen import LoadGenerator, load_trace, parse_mix, sweep
+
+    engine = get_engine()
+    engine.set_gc_mode(args.gc_mode)
+    engine.resize_pool(args.workers)
+    mix = parse_mix(args.mix)
+
+    if args.sweep:
+        rates = [float(r) for r in args.sweep.split(",")]
+
+        def on_level(result):
+            if not args.json:
+                print(f"{result.offered_rate:>9.1f} {result.throughput:>9.1f} {result.p50_ms:>9.1f} "
+                      f"{result.p95_ms:>9.1f} {result.p99_ms:>9.1f} {result.latency_growth:>7.2f} {result.unfinished:>10}")
+
+        if not args.json:
+            print(f"{'Offered/s':>9} {'Done/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Growth':>7} {'Unfinished':>10}")
+        results, saturation = sweep(engine, mix, rates, arrival=args.arrival, duration=args.duration,
+                                    slo_p99_ms=args.slo_p99_ms, drain_timeout=args.drain_timeout,
+                                    seed=args.seed, on_level=on_level)
+        gc_stats = engine.gc.get_stats()
+        engine.shutdown()
+        if args.json:
+            _print({"levels": [r.as_dict() for r in results], "saturation_rate": saturation, "gc": gc_stats}, True)
+        else:
+            print()
+            print(f"Saturation: {saturation}/s" if saturation else "Saturation: not reached")
+        return 0
+
+    trace = load_trace(args.trace) if args.trace else None
+    gen = LoadGenerator(engine, mix, arrival="trace" if trace is not None else args.arrival, rate=args.rate,
+                        duration=args.duration, trace=trace, speed=args.speed,
+                        drain_timeout=args.drain_timeout, seed=args.seed)
+    result = gen.run()
+    out = result.as_dict()
+    out["gc"] = engine.gc.get_stats()
+    engine.shutdown()
+    _print(out, args.json)
+    return 0 if result.unfinished == 0 else 1
+
+
+def measure_import_ms(modules=CORE_MODULES, repeat=3) -> float:
+    """Best-of-N wall time (ms) to import `modules` in a fresh interpreter."""
+    code = (
+        "import time; t = time.perf_counter(); "
+        + "; ".join(f"import {m}" for m in modules)
+        + "; print((time.perf_counter() - t) * 1000)"
+    )
+    best = float("inf")
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=parent_dir,
+                             capture_output=True, text=True, check=True)
+        best = min(best, float(out.stdout.strip()))
+    return best
+
+
+def cmd_import_time(args):
+    ms = measure_import_ms(repeat=args.repeat)
+    ok = ms <= args.budget_ms
+    _print({"modules": ", ".join(CORE_MODULES), "import_ms": round(ms, 2),
+            "budget_ms": args.budget_ms, "within_budget": ok}, args.json)
+    return 0 if ok else 1
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    common.add_argument("-v", "--verbose", action="store_true", help="Enable engine logging")
+
+    engine_opts = argparse.ArgumentParser(add_help=False)
+    engine_opts.add_argument("--gc-mode", choices=["default", "tuned", "deferred"], default="default",
+                             help="tuned: gc.freeze + higher thresholds; deferred: also collect only when idle")
+
+    parser = argparse.ArgumentParser(prog="tml", description="Headless Thread Management Library")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", parents=[common, engine_opts], help="Run a simulated workload and print engine stats")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--tasks", type=int, default=20)
+    p.add_argument("--type", choices=["CPU", "IO", "Mixed"], default="CPU")
+    p.add_argument("--priority", choices=list(PRIORITIES), default="normal")
+    p.add_argument("--timeout", type=float, default=None, help="Give up after N seconds")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("stats", parents=[common], help="Sample system stats once and print them")
+    p.add_argument("--wait", type=float, default=1.0, help="Sampling time in seconds")
+    p.add_argument("--top", type=int, default=10, help="Number of processes to list")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("serve", parents=[common, engine_opts], help="Serve Prometheus metrics over HTTP")
+    p.add_argument("--host", default="127.0.0.1", help="Bind address (localhost by default)")
+    p.add_argument("--port", type=int, default=9464)
+    p.add_argument("--refresh", type=float, default=1.0, help="Snapshot interval in seconds")
+    p.add_argument("--workers", type=int, default=0, help="Start an engine with N workers")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("history", parents=[common], help="Print recorded history from a history file")
+    p.add_argument("series", choices=["cpu", "ram", "threads", "queue_depth", "throughput"])
+    p.add_argument("--file", required=True, help="Memory-mapped history file (TML_HISTORY_FILE)")
+    p.add_argument("--minutes", type=float, default=60)
+    p.add_argument("--points", type=int, default=120, help="Max buckets; picks the resolution")
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("loadgen", parents=[common, engine_opts], help="Open-loop load test (fixed rate, trace replay or sweep)")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--arrival", choices=["constant", "poisson"], default="poisson")
+    p.add_argument("--rate", type=float, default=20.0, help="Arrivals per second")
+    p.add_argument("--duration", type=float, default=10.0, help="Seconds of arrivals per run/level (ignored with --trace, which replays the whole trace)")
+    p.add_argument("--mix", default="CPU:1:normal:exp:20",
+                   help="Comma-separated type[:weight[:priority[:dist[:mean_ms]]]] entries; "
+                        "dist is const, exp, uniform or lognormal")
+    p.add_argument("--trace", help="Replay arrivals from a CSV trace (time_s[,type[,priority[,service_ms]]])")
+    p.add_argument("--speed", type=float, default=1.0, help="Trace replay speed factor")
+    p.add_argument("--sweep", help="Comma-separated arrival rates; stops at the saturation point")
+    p.add_argument("--slo-p99-ms", type=float, default=None, help="Treat a level as saturated above this p99")
+    p.add_argument("--drain-timeout", type=float, default=30.0)
+    p.add_argument("--seed", type=int, default=None)
+    p.set_defaults(func=cmd_loadgen)
+
+    p = sub.add_parser("import-time", parents=[common], help="Check core import time against the budget")
+    p.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=cmd_import_time)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s [%(levelname)s] %(message)s")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,12 +5,14 @@ import uuid
 import logging
 import math
 import random
+from bisect import bisect_left
 from enum import IntEnum
 from dataclasses import dataclass, field
 from typing import Callable, Any, List, Optional, Dict
+from src.core.pubsub import ChangeFeed, Delta
+from src.core.gc_control import GCManager
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+# Logging is configured by the entry point (main.py / cli.py), never at import time.
 logger = logging.getLogger("HPCEngine")
 
 class Priority(IntEnum):
@@ -30,22 +32,61 @@ class Task:
     on_error: Optional[Callable] = field(default=None, compare=False)
     created_at: float = field(default_factory=time.time, compare=False)
 
+# Upper bounds (seconds) for task latency histograms; +Inf is implicit
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class LatencyHistogram:
+    """Fixed-bucket histogram. Each Worker owns its own, so observe() needs no lock."""
+    __slots__ = ("counts", "total")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+
+    def merge(self, other: "LatencyHistogram"):
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.total += other.total
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
 class Worker(threading.Thread):
-    def __init__(self, task_queue: queue.PriorityQueue, worker_id: int, pause_event: threading.Event):
+    def __init__(self, task_queue: queue.PriorityQueue, worker_id: int, pause_event: threading.Event,
+                 on_change: Optional[Callable[[int], None]] = None, on_idle: Optional[Callable[[], None]] = None,
+                 on_exit: Optional[Callable[["Worker"], None]] = None):
         super().__init__(daemon=True)
         self.task_queue = task_queue
         self.worker_id = worker_id
         self.pause_event = pause_event
+        self.on_change = on_change # called with worker_id on busy/idle transitions
+        self.on_idle = on_idle # called when no task arrived for a whole get() timeout
+        self.on_exit = on_exit # called with the worker once run() returns
         
         # State & Stats
         self.is_busy = False
         self.running = True
         self.current_task: Optional[Task] = None
         self.tasks_completed = 0
+        self.tasks_failed = 0
         self.total_runtime = 0.0
+        self.wait_hist = LatencyHistogram() # created -> started
+        self.run_hist = LatencyHistogram()  # started -> finished
+        self.task_started: Optional[float] = None
         self._stop_event = threading.Event()
 
     def run(self):
+        try:
+            self._loop()
+        finally:
+            if self.on_exit: self.on_exit(self)
+
+    def _loop(self):
         while self.running:
             try:
                 # 1. Check Pause
@@ -56,6 +97,7 @@ class Worker(threading.Thread):
                     priority, task = self.task_queue.get(timeout=0.5)
                 except queue.Empty:
                     if not self.running: break
+                    if self.on_idle: self.on_idle()
                     continue
 
                 if task is None: # Poison Pill
@@ -65,22 +107,29 @@ class Worker(threading.Thread):
                 self.is_busy = True
                 self.current_task = task
                 start_t = time.time()
+                self.task_started = start_t
+                self.wait_hist.observe(start_t - task.created_at)
+                if self.on_change: self.on_change(self.worker_id)
                 
                 try:
                     result = task.func(*task.args, **task.kwargs)
                     if task.on_complete:
                         task.on_complete(result)
                 except Exception as e:
+                    self.tasks_failed += 1
                     logger.error(f"Task {task.id} failed: {e}")
                     if task.on_error:
                         task.on_error(e)
                 finally:
                     duration = time.time() - start_t
+                    self.task_started = None # cleared first: readers may undercount, never double count
                     self.total_runtime += duration
+                    self.run_hist.observe(duration)
                     self.tasks_completed += 1
                     self.is_busy = False
                     self.current_task = None
                     self.task_queue.task_done()
+                    if self.on_change: self.on_change(self.worker_id)
             
             except Exception as e:
                 logger.error(f"Worker {self.worker_id} crash: {e}")
@@ -89,6 +138,13 @@ class Worker(threading.Thread):
     def stop(self):
         self.running = False
 
+    def busy_time(self, now: Optional[float] = None) -> float:
+        """Wall seconds spent executing tasks, including the one in progress."""
+        started = self.task_started
+        if started is None:
+            return self.total_runtime
+        return self.total_runtime + ((now or time.time()) - started)
+
 class HPCThreadEngine:
     """
     HPC Engine V2: 
@@ -97,15 +153,32 @@ class HPCThreadEngine:
     - Detailed Metrics
     - Task Cancellation (Flush)
     """
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, max_workers: int = 4, gc_mode: str = "default"):
         self.task_queue = queue.PriorityQueue()
         self.workers: List[Worker] = []
         self.lock = threading.Lock()
         self.pause_event = threading.Event()
         self.pause_event.set() # Initially running
         
-        # Stats history
-        self.completed_tasks_history = []
+        # Completions by workers that have since been removed, so totals never go backwards.
+        # A removed worker may still finish its current task (and one more it already
+        # dequeued), so it stays in `retiring` and is counted live until its thread exits.
+        # Time-series history lives in src.core.timeseries (sampled by SystemMonitor).
+        self.retiring: List[Worker] = []
+        self.retired_completed = 0
+        self.retired_failed = 0
+        self.retired_wait_hist = LatencyHistogram()
+        self.retired_run_hist = LatencyHistogram()
+
+        # Change feed: workers flag themselves dirty; deltas are collected at the
+        # subscribers' rate. Nothing is tracked while nobody is subscribed.
+        self.feed = ChangeFeed(snapshot=self._feed_snapshot, collect=self._feed_collect, name="engine")
+        self._dirty = set()
+        self._published = {"completed": 0, "failed": 0}
+
+        # GC pauses stop every worker at once; see src.core.gc_control for the modes
+        self.gc = GCManager(gc_mode)
+        self.gc.install()
         
         # Init
         self.resize_pool(max_workers)
@@ -115,11 +188,14 @@ class HPCThreadEngine:
         with self.lock:
             current = len(self.workers)
             if new_count > current:
-                # Add workers
+                # Add workers (a shut-down engine being reused needs its gc hook back)
+                self.gc.install()
                 for i in range(current, new_count):
-                    w = Worker(self.task_queue, i, self.pause_event)
+                    w = Worker(self.task_queue, i, self.pause_event, on_change=self._mark_dirty,
+                               on_idle=self._on_worker_idle, on_exit=self._on_worker_exit)
                     w.start()
                     self.workers.append(w)
+                    self._mark_dirty(i)
             elif new_count < current:
                 # Remove workers (Stop from end)
                 # We interpret "remove" as "stop taking new tasks and die"
@@ -128,10 +204,14 @@ class HPCThreadEngine:
                 for _ in range(diff):
                     w = self.workers.pop()
                     w.stop() # Soft stop
+                    self.retiring.append(w)
+                    self._mark_dirty(w.worker_id)
                     # w.join() # Don't block UI, let them die eventually
                     
                 # To be cleaner, we could also put None in queue, but priority queue makes that specific
                 # Simple boolean flag check in worker loop is enough for now.
+        if new_count == 0:
+            self.gc.on_idle() # no Worker left to report idle
 
     @property
     def num_workers(self):
@@ -144,11 +224,35 @@ class HPCThreadEngine:
         if len(self.workers) > 0:
             self.resize_pool(len(self.workers) - 1)
 
+    def set_gc_mode(self, mode: str):
+        """'default', 'tuned' (freeze + thresholds) or 'deferred' (also collect only when idle)."""
+        self.gc.install()
+        self.gc.set_mode(mode)
+
+    def _on_worker_exit(self, w: Worker):
+        # A removed worker's thread is done: fold its final counts into the totals
+        with self.lock:
+            if w not in self.retiring:
+                return
+            self.retiring.remove(w)
+            self.retired_completed += w.tasks_completed
+            self.retired_failed += w.tasks_failed
+            self.retired_wait_hist.merge(w.wait_hist)
+            self.retired_run_hist.merge(w.run_hist)
+
+    def _on_worker_idle(self):
+        # Deferred collections run once the whole pool has nothing to do
+        if self.gc.deferring and self.task_queue.empty() and not any(w.is_busy for w in self.workers + self.retiring):
+            self.gc.on_idle()
+
     def pause_workload(self):
         self.pause_event.clear()
+        self.gc.on_idle() # paused Workers never time out on the queue
+        self._notify()
 
     def resume_workload(self):
         self.pause_event.set()
+        self._notify()
 
     def cancel_all_tasks(self):
         """Clears the pending queue."""
@@ -161,6 +265,7 @@ class HPCThreadEngine:
                     self.task_queue.task_done()
             except queue.Empty:
                 pass
+            self._notify()
             
             # Reset pause event just in case they were stuck on pause
             # self.pause_event.set() 
@@ -181,45 +286,131 @@ class HPCThreadEngine:
             on_complete=on_complete,
             on_error=on_error
         )
+        self.gc.on_burst()
         self.task_queue.put((priority, task))
+        self._notify()
         return task_id
 
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every submitted task has finished. Returns False on timeout."""
+        q = self.task_queue
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with q.all_tasks_done:
+            while q.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                q.all_tasks_done.wait(remaining)
+        return True
+
     def shutdown(self, wait=True):
         self.resize_pool(0)
+        self.gc.uninstall() # hand the interpreter its GC settings and callback list back
         
     def get_stats(self) -> Dict:
         """Returns detailed engine statistics."""
         with self.lock:
-            active_workers = sum(1 for w in self.workers if w.is_busy)
-            total_completed = sum(w.tasks_completed for w in self.workers)
-            
-            return {
-                "total_workers": len(self.workers),
-                "active_workers": active_workers,
-                "idle_workers": len(self.workers) - active_workers,
-                "pending_tasks": self.task_queue.qsize(),
-                "total_completed": total_completed,
-                "is_paused": not self.pause_event.is_set()
-            }
+            stats = self._stats_locked()
+        stats["gc"] = self.gc.get_stats()
+        return stats
+
+    def _stats_locked(self) -> Dict:
+        active_workers = sum(1 for w in self.workers if w.is_busy)
+        counted = self.workers + self.retiring
+        total_completed = self.retired_completed + sum(w.tasks_completed for w in counted)
+        total_failed = self.retired_failed + sum(w.tasks_failed for w in counted)
+
+        return {
+            "total_workers": len(self.workers),
+            "active_workers": active_workers,
+            "idle_workers": len(self.workers) - active_workers,
+            "pending_tasks": self.task_queue.qsize(),
+            "total_completed": total_completed,
+            "total_failed": total_failed,
+            "is_paused": not self.pause_event.is_set()
+        }
+
+    def get_latency_histograms(self) -> Dict[str, LatencyHistogram]:
+        """Merged queue-wait and run-time histograms across all (incl. removed) workers."""
+        wait, run = LatencyHistogram(), LatencyHistogram()
+        with self.lock:
+            wait.merge(self.retired_wait_hist)
+            run.merge(self.retired_run_hist)
+            for w in self.workers + self.retiring:
+                wait.merge(w.wait_hist)
+                run.merge(w.run_hist)
+        return {"wait": wait, "run": run}
 
     def get_worker_details(self):
         """Returns list of detail dicts for visualization tooltips."""
         with self.lock:
-            details = []
-            for w in self.workers:
-                current_type = w.current_task.type if w.current_task else None
-                priority = None
-                if w.current_task:
-                    priority = w.current_task.priority
-                    
-                details.append({
-                    "id": w.worker_id,
-                    "busy": w.is_busy,
-                    "completed": w.tasks_completed,
-                    "current_task": current_type,
-                    "priority": priority
-                })
-            return details
+            now = time.time()
+            return [self._worker_detail(w, now) for w in self.workers]
+
+    def _worker_detail(self, w: Worker, now: float) -> Dict:
+        task = w.current_task
+        return {
+            "id": w.worker_id,
+            "busy": w.is_busy,
+            "completed": w.tasks_completed,
+            "current_task": task.type if task else None,
+            "priority": task.priority if task else None,
+            "native_id": w.native_id,
+            "busy_time": w.busy_time(now)
+        }
+
+    # --- Change feed (push updates for UIs / subscribers) ---
+    def subscribe(self, max_rate: float = 10.0):
+        """
+        Subscribe to coalesced engine deltas, delivered at most `max_rate` times/s:
+        changed/removed workers (keyed by worker id, rows as in get_worker_details),
+        'completed'/'failed' counter increments and the latest queue/pool values.
+        The first delta is a full snapshot.
+        """
+        return self.feed.subscribe(max_rate)
+
+    def _mark_dirty(self, worker_id: int):
+        # Tracked for paused subscribers too, so a hidden tab catches up on resume
+        if self.feed.subscribed:
+            self._dirty.add(worker_id)
+            self.feed.notify()
+
+    def _notify(self):
+        if self.feed.subscribed:
+            self.feed.notify()
+
+    def _feed_values(self, stats: Dict) -> Dict:
+        return {k: stats[k] for k in ("total_workers", "active_workers", "idle_workers", "pending_tasks", "is_paused")}
+
+    def _feed_snapshot(self) -> Delta:
+        with self.lock:
+            now = time.time()
+            return Delta(
+                values=self._feed_values(self._stats_locked()),
+                changed={w.worker_id: self._worker_detail(w, now) for w in self.workers},
+                counters=dict(self._published), # baseline for the increments that follow
+            )
+
+    def _feed_collect(self) -> Delta:
+        ids = []
+        while self._dirty:
+            ids.append(self._dirty.pop()) # pop() is atomic; later changes re-flag the id
+        with self.lock:
+            now = time.time()
+            stats = self._stats_locked()
+            changed, removed = {}, []
+            for wid in ids:
+                if wid < len(self.workers):
+                    changed[wid] = self._worker_detail(self.workers[wid], now)
+                else:
+                    removed.append(wid)
+            counters = {
+                "completed": stats["total_completed"] - self._published["completed"],
+                "failed": stats["total_failed"] - self._published["failed"],
+            }
+            self._published = {"completed": stats["total_completed"], "failed": stats["total_failed"]}
+        return Delta(values=self._feed_values(stats), changed=changed, removed=removed,
+                     counters={k: v for k, v in counters.items() if v})
 
     # --- Simulation helpers ---
     def initialize_workers(self, count):
@@ -245,4 +436,24 @@ class HPCThreadEngine:
         for _ in range(task_count):
             self.submit_task(dummy_task, type, type=type, priority=priority)
 
-hpc_engine = HPCThreadEngine(max_workers=0)
+_engine: Optional[HPCThreadEngine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> HPCThreadEngine:
+    """Returns the shared engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = HPCThreadEngine(max_workers=0)
+    return _engine
+
+def peek_engine() -> Optional[HPCThreadEngine]:
+    """Returns the shared engine if it exists, without creating it."""
+    return _engine
+
+def __getattr__(name):
+    # Backwards compatibility: `from src.core.engine import hpc_engine`
+    if name == "hpc_engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,172 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from src.core.engine import LATENCY_BUCKETS, peek_engine
+
+logger = logging.getLogger("HPCEngine")
+
+# Prometheus text exposition (format 0.0.4) for engine and monitor metrics.
+# A refresher thread renders the page from snapshots every `refresh` seconds;
+# HTTP handlers only hand out the cached bytes, so a scrape never touches the
+# engine or monitor locks no matter how often it happens.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Page:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def metric(self, name: str, kind: str, help_text: str):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value, labels: Optional[dict] = None):
+        if labels:
+            inner = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            name = f"{name}{{{inner}}}"
+        self.lines.append(f"{name} {value!r}")
+
+    def histogram(self, name: str, help_text: str, hist):
+        self.metric(name, "histogram", help_text)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, hist.counts):
+            cumulative += count
+            self.sample(f"{name}_bucket", cumulative, {"le": f"{bound:g}"})
+        cumulative += hist.counts[-1]
+        self.sample(f"{name}_bucket", cumulative, {"le": "+Inf"})
+        self.sample(f"{name}_sum", hist.total)
+        self.sample(f"{name}_count", cumulative)
+
+    def render(self) -> bytes:
+        return ("\n".join(self.lines) + "\n").encode()
+
+
+def render_metrics(monitor=None, worker_metrics: bool = True) -> bytes:
+    """Builds the full exposition page from fresh engine/monitor snapshots."""
+    page = _Page()
+
+    engine = peek_engine()
+    if engine is not None:
+        stats = engine.get_stats()
+        hists = engine.get_latency_histograms()
+        page.metric("tml_engine_workers", "gauge", "Worker threads in the pool.")
+        page.sample("tml_engine_workers", stats["total_workers"])
+        page.metric("tml_engine_active_workers", "gauge", "Workers currently executing a task.")
+        page.sample("tml_engine_active_workers", stats["active_workers"])
+        page.metric("tml_engine_pending_tasks", "gauge", "Tasks waiting in the queue.")
+        page.sample("tml_engine_pending_tasks", stats["pending_tasks"])
+        page.metric("tml_engine_paused", "gauge", "1 if the workload is paused.")
+        page.sample("tml_engine_paused", int(stats["is_paused"]))
+        page.metric("tml_engine_tasks_completed_total", "counter", "Tasks finished (success or failure).")
+        page.sample("tml_engine_tasks_completed_total", stats["total_completed"])
+        page.metric("tml_engine_tasks_failed_total", "counter", "Tasks that raised an exception.")
+        page.sample("tml_engine_tasks_failed_total", stats["total_failed"])
+        page.histogram("tml_engine_task_wait_seconds", "Time from submit to start of execution.", hists["wait"])
+        page.histogram("tml_engine_task_run_seconds", "Task execution time.", hists["run"])
+        gc_stats = stats["gc"]
+        page.metric("tml_engine_gc_pauses_total", "counter", "Garbage-collector passes (each pauses every thread).")
+        page.sample("tml_engine_gc_pauses_total", gc_stats["pauses"])
+        page.metric("tml_engine_gc_pause_seconds_total", "counter", "Time spent in garbage-collector passes.")
+        page.sample("tml_engine_gc_pause_seconds_total", gc_stats["pause_total_ms"] / 1000)
+        page.metric("tml_engine_gc_pause_max_seconds", "gauge", "Longest garbage-collector pause so far.")
+        page.sample("tml_engine_gc_pause_max_seconds", gc_stats["pause_max_ms"] / 1000)
+        page.metric("tml_engine_gc_collections_total", "counter", "Garbage-collector passes by generation.")
+        for gen, count in enumerate(gc_stats["collections"]):
+            page.sample("tml_engine_gc_collections_total", count, {"generation": gen})
+
+    if monitor is not None and monitor.running:
+        stats = monitor.get_stats(include_processes=False)
+        page.metric("tml_system_cpu_percent", "gauge", "Host CPU utilization.")
+        page.sample("tml_system_cpu_percent", float(stats["cpu"]))
+        page.metric("tml_system_ram_percent", "gauge", "Host RAM utilization.")
+        page.sample("tml_system_ram_percent", float(stats["ram_percent"]))
+        page.metric("tml_system_ram_used_bytes", "gauge", "Host RAM in use.")
+        page.sample("tml_system_ram_used_bytes", monitor.ram_used)
+        page.metric("tml_system_threads", "gauge", "Threads across all processes.")
+        page.sample("tml_system_threads", stats["total_threads"])
+        overhead = stats["monitor"]
+        page.metric("tml_monitor_cpu_seconds_total", "counter", "CPU time used by the monitor thread.")
+        page.sample("tml_monitor_cpu_seconds_total", float(overhead["cpu_seconds"]))
+
+        if worker_metrics and engine is not None:
+            workers, pool = monitor.get_worker_cpu()
+            if pool:
+                page.metric("tml_engine_cpu_cores", "gauge", "CPU cores used by engine workers.")
+                page.sample("tml_engine_cpu_cores", float(pool["cpu_cores"]))
+                page.metric("tml_engine_gil_contention_ratio", "gauge", "Estimated share of busy time spent waiting for the GIL.")
+                page.sample("tml_engine_gil_contention_ratio", float(pool["gil_contention"]))
+            if workers:
+                page.metric("tml_worker_cpu_percent", "gauge", "CPU utilization per worker thread.")
+                for wid, m in sorted(workers.items()):
+                    page.sample("tml_worker_cpu_percent", float(m["cpu_percent"]), {"worker": wid})
+
+    return page.render()
+
+
+class MetricsExporter:
+    """
+    Optional HTTP exporter thread. Binds to localhost by default; serves
+    /metrics from a snapshot refreshed every `refresh` seconds.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 9464, refresh: float = 1.0,
+                 monitor=None, worker_metrics: bool = True):
+        self.host = host
+        self.port = port
+        self.refresh = refresh
+        self.monitor = monitor
+        self.worker_metrics = worker_metrics
+        self.running = False
+        self._page = b""
+        self._stop = threading.Event()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def snapshot(self):
+        try:
+            self._page = render_metrics(self.monitor, self.worker_metrics)  # atomic swap
+        except Exception as e:
+            logger.error(f"Metrics snapshot failed: {e}")
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh):
+            self.snapshot()
+
+    def start(self):
+        if self.running:
+            return
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404, "Try /metrics")
+                    return
+                body = exporter._page
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # scrapes are frequent; keep stderr quiet
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]  # resolves port=0
+        self.running = True
+        self._stop.clear()
+        self.snapshot()
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        threading.Thread(target=self._refresh_loop, daemon=True).start()
+        logger.info(f"Metrics exporter listening on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self._stop.set()
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,189 @@
+import gc
+import math
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("HPCEngine")
+
+# Garbage-collector pause management for the engine.
+# A cyclic collection stops every thread (it runs with the GIL held), so one
+# young-generation pass triggered by Task/tuple/dict churn on the submit path
+# delays every Worker at once.
+#
+# Modes:
+# - "default":  interpreter settings untouched; pauses are only measured.
+# - "tuned":    collect once, gc.freeze() everything alive (modules, UI, engine
+#               state) so later passes never rescan it, and raise the
+#               generation thresholds so churn triggers far fewer passes.
+# - "deferred": "tuned", plus automatic collection is switched off while tasks
+#               are being submitted and run, and done in the next idle period.
+#               A safety valve still collects the young generation if too many
+#               allocations pile up during a long burst, and a timer ends any
+#               deferral that lasts max_defer_s (paused pool, no workers, one
+#               long batch with no further submits).
+#
+# Pause counts/durations come from gc.callbacks in every mode.
+
+GC_MODES = ("default", "tuned", "deferred")
+TUNED_THRESHOLDS = (20000, 20, 20)
+MAX_DEFERRED_ALLOCATIONS = 200000  # young-gen objects before the valve collects anyway
+MAX_DEFER_SECONDS = 5.0  # longest automatic collection stays off, idle or not
+
+
+class GCManager:
+    def __init__(self, mode: str = "default", thresholds: Tuple[int, int, int] = TUNED_THRESHOLDS,
+                 max_deferred: int = MAX_DEFERRED_ALLOCATIONS, max_defer_s: float = MAX_DEFER_SECONDS):
+        if mode not in GC_MODES:
+            raise ValueError(f"Unknown GC mode: {mode}")
+        self.mode = "default"
+        self.tuned_thresholds = tuple(thresholds)
+        self.max_deferred = max_deferred
+        self.max_defer_s = max_defer_s
+
+        # Interpreter state to restore on uninstall / mode change
+        self._saved_thresholds = gc.get_threshold()
+        self._saved_enabled = gc.isenabled()
+        self._frozen = False
+
+        # Deferral state (transitions under the lock; the hot-path check is lock-free)
+        self.lock = threading.Lock()
+        self.deferring = False
+        self._episode = 0  # bumped per deferral so a late timer can't end the next one
+        self._deadline: Optional[threading.Timer] = None
+
+        # Pause stats (written from the gc callback, which runs with the GIL held)
+        self.collections = [0, 0, 0]
+        self.pauses = 0
+        self.pause_total = 0.0
+        self.pause_max = 0.0
+        self.collected = 0
+        self.recent = deque(maxlen=1024)  # last pause durations, for percentiles
+        self.idle_collections = 0
+        self.valve_collections = 0
+        self._start: Optional[float] = None
+        self._installed = False
+
+        self.set_mode(mode)
+
+    # --- Pause accounting ---
+    def _callback(self, phase, info):
+        if phase == "start":
+            self._start = time.perf_counter()
+            return
+        if self._start is None:
+            return
+        pause = time.perf_counter() - self._start
+        self._start = None
+        self.pauses += 1
+        self.pause_total += pause
+        if pause > self.pause_max:
+            self.pause_max = pause
+        self.recent.append(pause)
+        gen = info.get("generation", 0)
+        if 0 <= gen < 3:
+            self.collections[gen] += 1
+        self.collected += info.get("collected", 0)
+
+    def install(self):
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self):
+        """Removes the callback and restores the interpreter's GC settings."""
+        self.set_mode("default")
+        if self._installed:
+            try:
+                gc.callbacks.remove(self._callback)
+            except ValueError:
+                pass
+            self._installed = False
+
+    # --- Modes ---
+    def set_mode(self, mode: str):
+        if mode not in GC_MODES:
+            raise ValueError(f"Unknown GC mode: {mode}")
+        self._end_deferral(collect=False)
+        if mode == "default":
+            gc.set_threshold(*self._saved_thresholds)
+            if self._frozen:
+                gc.unfreeze()
+                self._frozen = False
+        elif self.mode == "default":
+            self._saved_thresholds = gc.get_threshold()
+            self._saved_enabled = gc.isenabled()
+            # Collect first so garbage isn't frozen with the long-lived objects
+            gc.collect()
+            gc.freeze()
+            self._frozen = True
+            gc.set_threshold(*self.tuned_thresholds)
+        if mode != self.mode:
+            logger.info(f"GC mode: {mode} (thresholds {gc.get_threshold()}, frozen {gc.get_freeze_count()})")
+        self.mode = mode
+
+    # --- Deferral (called by the engine) ---
+    def on_burst(self):
+        """Work is arriving: hold automatic collections until the next idle period."""
+        if self.mode != "deferred":
+            return
+        if not self.deferring:
+            with self.lock:
+                if not self.deferring and self.mode == "deferred":
+                    self.deferring = True
+                    self._episode += 1
+                    self._deadline = threading.Timer(self.max_defer_s, self._on_deadline, args=(self._episode,))
+                    self._deadline.daemon = True
+                    self._deadline.start()
+                    gc.disable()
+        elif gc.get_count()[0] > self.max_deferred:
+            # Safety valve: a young pass now is cheaper than an unbounded one later
+            self.valve_collections += 1
+            gc.collect(1)
+
+    def on_idle(self):
+        """The pool ran out of work: run the deferred collection now."""
+        if self.deferring:
+            self._end_deferral(collect=True)
+
+    def _on_deadline(self, episode: int):
+        # Timer thread: no idle period came within max_defer_s
+        if self._end_deferral(collect=False, episode=episode):
+            self.valve_collections += 1
+            gc.collect(1)
+
+    def _end_deferral(self, collect: bool, episode: Optional[int] = None) -> bool:
+        with self.lock:
+            if not self.deferring or (episode is not None and episode != self._episode):
+                return False
+            self.deferring = False
+            if self._deadline is not None:
+                self._deadline.cancel()
+                self._deadline = None
+            if self._saved_enabled:
+                gc.enable()
+        if collect:
+            self.idle_collections += 1
+            gc.collect(1)
+        return True
+
+    # --- Stats ---
+    def get_stats(self) -> Dict:
+        recent = sorted(self.recent)
+        p99 = recent[max(0, math.ceil(len(recent) * 0.99) - 1)] if recent else 0.0
+        return {
+            "mode": self.mode,
+            "thresholds": gc.get_threshold(),
+            "frozen_objects": gc.get_freeze_count(),
+            "deferring": self.deferring,
+            "collections": list(self.collections),
+            "pauses": self.pauses,
+            "pause_total_ms": round(self.pause_total * 1000, 3),
+            "pause_max_ms": round(self.pause_max * 1000, 3),
+            "pause_p99_ms": round(p99 * 1000, 3),
+            "collected": self.collected,
+            "idle_collections": self.idle_collections,
+            "valve_collections": self.valve_collections,
+        }
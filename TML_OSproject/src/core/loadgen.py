@@ -0,0 +1,365 @@
+import math
+import time
+import random
+import logging
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from src.core.engine import Priority
+
+logger = logging.getLogger("HPCEngine")
+
+# Open-loop synthetic load generator.
+# Arrivals are scheduled against the clock (constant rate, Poisson, or replayed
+# from a trace) and submitted whether or not earlier tasks have finished, so a
+# saturated pool shows up as growing latency instead of a slower generator.
+# Latency is measured from the *intended* arrival time to completion, which
+# keeps generator lag from hiding queueing delay (no coordinated omission).
+#
+# Trace files are CSV, one arrival per line ('#' starts a comment):
+#     time_s[,type[,priority[,service_ms]]]
+# Times may be absolute or relative; they are replayed relative to the first.
+
+ARRIVALS = ("constant", "poisson", "trace")
+DISTRIBUTIONS = ("const", "exp", "uniform", "lognormal")
+# Late/early median latency ratio above which a level counts as queueing up
+LATENCY_GROWTH_LIMIT = 1.5
+
+
+@dataclass
+class ServiceTime:
+    """Service-time distribution (seconds)."""
+    dist: str = "exp"
+    mean: float = 0.05
+
+    def sample(self, rng: random.Random) -> float:
+        if self.dist == "const":
+            return self.mean
+        if self.dist == "exp":
+            return rng.expovariate(1.0 / self.mean)
+        if self.dist == "uniform":
+            return rng.uniform(0.0, 2 * self.mean)
+        if self.dist == "lognormal":
+            sigma = 1.0
+            return rng.lognormvariate(math.log(self.mean) - sigma ** 2 / 2, sigma)
+        raise ValueError(f"Unknown service-time distribution: {self.dist}")
+
+
+@dataclass
+class TaskClass:
+    """One entry of a workload mix."""
+    type: str = "CPU"  # CPU (spin), IO (sleep), Mixed (half each)
+    weight: float = 1.0
+    priority: int = Priority.NORMAL
+    service: ServiceTime = field(default_factory=ServiceTime)
+
+
+def parse_mix(spec: str) -> List[TaskClass]:
+    """
+    Parses 'type[:weight[:priority[:dist[:mean_ms]]]]' entries separated by commas,
+    e.g. 'CPU:0.7:normal:exp:20,IO:0.3:low:const:50'.
+    """
+    mix = []
+    for entry in spec.split(","):
+        parts = entry.strip().split(":")
+        if not parts[0]:
+            continue
+        cls = TaskClass(type=parts[0])
+        if len(parts) > 1 and parts[1]:
+            cls.weight = float(parts[1])
+        if len(parts) > 2 and parts[2]:
+            cls.priority = Priority[parts[2].upper()]
+        if len(parts) > 3 and parts[3]:
+            if parts[3] not in DISTRIBUTIONS:
+                raise ValueError(f"Unknown service-time distribution: {parts[3]}")
+            cls.service.dist = parts[3]
+        if len(parts) > 4 and parts[4]:
+            cls.service.mean = float(parts[4]) / 1000.0
+        mix.append(cls)
+    if not mix:
+        raise ValueError("Empty task mix")
+    return mix
+
+
+def simulated_task(task_type: str, service: float):
+    """
+    Occupies a worker for `service` seconds: CPU spins, IO sleeps, Mixed does both.
+    The spin is measured in this thread's CPU time, so CPU work queues on the GIL
+    like real Python code instead of overlapping with other workers.
+    """
+    if task_type == "IO":
+        time.sleep(service)
+        return
+    spin = service / 2 if task_type == "Mixed" else service
+    end = time.thread_time() + spin
+    while time.thread_time() < end:
+        pass
+    if task_type == "Mixed":
+        time.sleep(service - spin)
+
+
+# --- Arrival processes: yield (offset_s, TaskClass or None, service_s or None) ---
+
+Arrival = Tuple[float, Optional[TaskClass], Optional[float]]
+
+
+def constant_arrivals(rate: float) -> Iterator[Arrival]:
+    gap = 1.0 / rate
+    i = 0
+    while True:
+        yield i * gap, None, None
+        i += 1
+
+
+def poisson_arrivals(rate: float, rng: random.Random) -> Iterator[Arrival]:
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate)
+        yield t, None, None
+
+
+def load_trace(path: str) -> List[Arrival]:
+    arrivals = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = [p.strip() for p in line.split(",")]
+            cls = service = None
+            if len(parts) > 1 and parts[1]:
+                cls = TaskClass(type=parts[1])
+                if len(parts) > 2 and parts[2]:
+                    cls.priority = Priority[parts[2].upper()]
+            if len(parts) > 3 and parts[3]:
+                service = float(parts[3]) / 1000.0
+            arrivals.append((float(parts[0]), cls, service))
+    arrivals.sort(key=lambda a: a[0])
+    if arrivals:
+        t0 = arrivals[0][0]
+        arrivals = [(t - t0, cls, service) for t, cls, service in arrivals]
+    return arrivals
+
+
+def trace_arrivals(trace: Sequence[Arrival], speed: float = 1.0) -> Iterator[Arrival]:
+    for t, cls, service in trace:
+        yield t / speed, cls, service
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_growth(samples: Sequence[Tuple[float, float]]) -> float:
+    """
+    Median latency of the last quarter of arrivals over that of the first quarter.
+    ~1 when the pool keeps up; grows with the backlog when it doesn't.
+    """
+    if len(samples) < 8:
+        return 1.0
+    ordered = sorted(samples)
+    q = len(ordered) // 4
+    early = sorted(d - i for i, d in ordered[:q])
+    late = sorted(d - i for i, d in ordered[-q:])
+    base = percentile(early, 50)
+    return percentile(late, 50) / base if base > 0 else 1.0
+
+
+@dataclass
+class LoadResult:
+    offered_rate: float      # arrivals/s over the arrival window (first -> last arrival)
+    duration_s: float        # start -> last completion
+    submitted: int
+    completed: int
+    failed: int
+    unfinished: int          # still queued/running when the drain timeout hit
+    throughput: float        # completions/s over the completion window (first -> last completion)
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    mean_ms: float
+    max_lag_ms: float        # worst submit delay behind schedule (generator health)
+    latency_growth: float    # median latency of the last quarter of arrivals / first quarter
+
+    def as_dict(self):
+        return {k: round(v, 3) if isinstance(v, float) else v for k, v in asdict(self).items()}
+
+
+class LoadGenerator:
+    """
+    Submits tasks to `engine` following an arrival process for `duration` seconds
+    (a trace is always replayed to its end; `duration` is ignored), then waits up
+    to `drain_timeout` for outstanding tasks.
+    """
+    def __init__(self, engine, mix: Sequence[TaskClass], arrival: str = "poisson", rate: float = 10.0,
+                 duration: float = 10.0, trace: Optional[Sequence[Arrival]] = None, speed: float = 1.0,
+                 drain_timeout: float = 30.0, seed: Optional[int] = None):
+        if arrival not in ARRIVALS:
+            raise ValueError(f"Unknown arrival process: {arrival}")
+        if arrival == "trace" and trace is None:
+            raise ValueError("Trace arrivals need a trace")
+        if arrival != "trace" and rate <= 0:
+            raise ValueError("Arrival rate must be positive")
+        self.engine = engine
+        self.mix = list(mix)
+        self.arrival = arrival
+        self.rate = rate
+        self.duration = None if arrival == "trace" else duration
+        self.trace = trace
+        self.speed = speed
+        self.drain_timeout = drain_timeout
+        self.rng = random.Random(seed)
+        self._weights = [c.weight for c in self.mix]
+
+        # Results: (intended arrival, completion) per finished task. Appends come
+        # from worker threads; list.append is atomic.
+        self.samples: List[Tuple[float, float]] = []
+        self.failed = 0
+        self.submitted = 0
+        self.max_lag = 0.0
+        self.result: Optional[LoadResult] = None
+        self.running = False
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _arrivals(self) -> Iterator[Arrival]:
+        if self.arrival == "constant":
+            return constant_arrivals(self.rate)
+        if self.arrival == "poisson":
+            return poisson_arrivals(self.rate, self.rng)
+        return trace_arrivals(self.trace, self.speed)
+
+    def _submit(self, intended: float, cls: TaskClass, service: float):
+        def done(_result):
+            self.samples.append((intended, time.monotonic()))
+
+        def failed(_error):
+            with self._lock:
+                self.failed += 1
+            done(None)
+
+        self.engine.submit_task(simulated_task, cls.type, service, priority=cls.priority, type=cls.type,
+                                on_complete=done, on_error=failed)
+        self.submitted += 1
+
+    def run(self) -> LoadResult:
+        """Blocking run; returns (and stores) the result."""
+        self.running = True
+        self._stop.clear()
+        self.samples = []
+        self.failed = self.submitted = 0
+        self.max_lag = 0.0
+        rng = self.rng
+        start = time.monotonic()
+        end_offset = 0.0
+
+        for offset, cls, service in self._arrivals():
+            if self._stop.is_set() or (self.duration is not None and offset > self.duration):
+                break
+            due = start + offset
+            delay = due - time.monotonic()
+            if delay > 0:
+                if self._stop.wait(delay):
+                    break
+            else:
+                self.max_lag = max(self.max_lag, -delay)
+            if cls is None:
+                cls = rng.choices(self.mix, self._weights)[0]
+            if service is None:
+                service = cls.service.sample(rng)
+            self._submit(due, cls, service)
+            end_offset = offset
+
+        # Drain: wait for every submitted task to report back
+        deadline = time.monotonic() + self.drain_timeout
+        while len(self.samples) < self.submitted and time.monotonic() < deadline and not self._stop.is_set():
+            time.sleep(0.01)
+        samples = list(self.samples)
+        finished = [d for _, d in samples]
+        elapsed = (max(finished) if finished else time.monotonic()) - start
+
+        # Offered rate and throughput use matching windows: arrivals span
+        # first -> last arrival, completions span first -> last completion.
+        # A pool that keeps up finishes n tasks over about the same span it
+        # received them; a saturated one stretches the completion span.
+        window = max(end_offset, 1e-9)
+        done_span = max(finished) - min(finished) if len(finished) > 1 else 0.0
+        lat = sorted(d - i for i, d in samples)
+        self.result = LoadResult(
+            offered_rate=(self.submitted - 1) / window if self.submitted > 1 else 0.0,
+            duration_s=elapsed,
+            submitted=self.submitted,
+            completed=len(lat) - self.failed,
+            failed=self.failed,
+            unfinished=self.submitted - len(lat),
+            throughput=(len(lat) - 1) / done_span if done_span > 0 else 0.0,
+            p50_ms=percentile(lat, 50) * 1000,
+            p95_ms=percentile(lat, 95) * 1000,
+            p99_ms=percentile(lat, 99) * 1000,
+            max_ms=(lat[-1] if lat else 0.0) * 1000,
+            mean_ms=(sum(lat) / len(lat) if lat else 0.0) * 1000,
+            max_lag_ms=self.max_lag * 1000,
+            latency_growth=latency_growth(samples),
+        )
+        self.running = False
+        return self.result
+
+    def start(self, on_done: Optional[Callable[[LoadResult], None]] = None) -> threading.Thread:
+        """Runs in a background thread (e.g. from the UI) and returns it; `on_done` gets the result."""
+        def target():
+            try:
+                result = self.run()
+            except Exception as e:
+                logger.error(f"Load generator failed: {e}")
+                self.running = False
+                return
+            if on_done:
+                on_done(result)
+        self.running = True
+        self._thread = threading.Thread(target=target, name="loadgen", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def progress(self) -> Tuple[int, int]:
+        """(completed or failed, submitted) so far."""
+        return len(self.samples), self.submitted
+
+
+def sweep(engine, mix: Sequence[TaskClass], rates: Sequence[float], arrival: str = "poisson",
+          duration: float = 10.0, slo_p99_ms: Optional[float] = None, efficiency: float = 0.95,
+          drain_timeout: float = 30.0, seed: Optional[int] = None,
+          on_level: Optional[Callable[[LoadResult], None]] = None) -> Tuple[List[LoadResult], Optional[float]]:
+    """
+    Runs one open-loop level per rate (ascending). A level is saturated when
+    tasks are left unfinished, when throughput falls below `efficiency` x offered
+    load while latency grows over the run (a backlog is building), or when p99
+    exceeds `slo_p99_ms`. Stops at the first saturated level and returns
+    (results, saturation rate or None).
+    """
+    results = []
+    for rate in sorted(rates):
+        gen = LoadGenerator(engine, mix, arrival=arrival, rate=rate, duration=duration,
+                            drain_timeout=drain_timeout, seed=seed)
+        result = gen.run()
+        results.append(result)
+        if on_level:
+            on_level(result)
+        falling_behind = (result.throughput < efficiency * result.offered_rate
+                          and result.latency_growth > LATENCY_GROWTH_LIMIT)
+        saturated = result.unfinished > 0 or falling_behind
+        if slo_p99_ms is not None and result.p99_ms > slo_p99_ms:
+            saturated = True
+        if saturated:
+            return results, rate
+        engine.wait_until_idle(timeout=drain_timeout)
+    return results, None
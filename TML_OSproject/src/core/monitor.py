@@ -1,93 +1,337 @@
-import psutil
 import time
 import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional
 from src.utils.helpers import bytes_to_human
+from src.core.proc_scanner import ProcessScanner, count_threads
+from src.core.thread_stats import ThreadSampler
+from src.core.pubsub import ChangeFeed, Delta
+
+if TYPE_CHECKING:
+    from src.core.timeseries import TimeSeriesStore
+
+# psutil and the history store are imported lazily (in start/_monitor_loop) so
+# that importing this module stays cheap for headless callers that never start
+# the monitor.
+
+@dataclass
+class SamplingTier:
+    interval: float          # seconds between samples while consumers are active
+    on_demand: bool = False  # only sampled while a consumer has asked for it recently
+
+DEFAULT_TIERS = {
+    "cpu_ram": SamplingTier(0.5),
+    "threads": SamplingTier(5.0),
+    "processes": SamplingTier(1.0, on_demand=True),
+    "engine": SamplingTier(1.0),  # queue depth / throughput, only once an engine exists
+    "workers": SamplingTier(1.0, on_demand=True),  # per-worker CPU attribution
+}
 
 class SystemMonitor:
-    def __init__(self):
+    """
+    Background system sampler with per-metric tiers.
+    - Each tier has its own interval; nothing blocks the loop (cpu_percent is non-blocking).
+    - When no consumer has read stats for `idle_after` seconds, every interval is
+      multiplied by `idle_backoff`. A read wakes the loop immediately.
+    - On-demand tiers (process table) only run while someone is asking for them.
+    - The monitor's own CPU cost is reported under stats['monitor'].
+    - Every sample is also recorded into a TimeSeriesStore (`history`).
+    - Subscribers (subscribe()) get coalesced deltas pushed instead of polling.
+    """
+    def __init__(self, top_k: int = 50, tiers: Optional[Dict[str, SamplingTier]] = None,
+                 idle_after: float = 10.0, idle_backoff: float = 10.0,
+                 history: Optional["TimeSeriesStore"] = None):
         self.lock = threading.Lock()
         self.running = False
         self.cpu_percent = 0
         self.ram_percent = 0
-        self.ram_total = psutil.virtual_memory().total
+        self.ram_total = 0
         self.ram_used = 0
         self.total_threads = 0
         self.monitor_thread = None
         self.top_processes = []
-    
+        self.all_processes = [] # only maintained while a subscriber wants every row
+        self.top_k = top_k
+        self.scanner = ProcessScanner()
+        self.history = history  # resolved to the shared store on start()
+        self._engine_completed = None
+        self.thread_sampler = ThreadSampler()
+        self.worker_cpu: Dict[int, Dict] = {}
+        self.worker_pool: Dict = {}
+
+        # Push updates: only computed while someone is subscribed
+        self.feed = ChangeFeed(snapshot=self._feed_snapshot, name="monitor")
+        self._published_rows: Dict[int, Dict] = {}
+
+        # Sampling schedule
+        self.tiers = dict(DEFAULT_TIERS)
+        if tiers:
+            self.tiers.update(tiers)
+        self.idle_after = idle_after
+        self.idle_backoff = idle_backoff
+        self._last_read = 0.0
+        self._last_demand: Dict[str, float] = {}
+        self._wake = threading.Event()
+
+        # Self-overhead accounting
+        self._cpu_used = 0.0
+        self._started_at = None
+        self._samples = {name: 0 for name in self.tiers}
+        self._last_cost_ms = {name: 0.0 for name in self.tiers}
+
     def start(self):
         if not self.running:
             self.running = True
+            self._last_read = time.monotonic()
+            if self.history is None:
+                from src.core.timeseries import get_history
+                self.history = get_history()
             self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
             self.monitor_thread.start()
 
     def stop(self):
         self.running = False
-    
+        self._wake.set()
+
+    # --- Consumer signals ---
+    def _touch(self, now: float):
+        idle = self.is_idle(now)
+        self._last_read = now
+        if idle:
+            self._wake.set()
+
+    def request(self, tier: str):
+        """
+        Marks a tier as wanted until demand lapses: on-demand tiers are sampled,
+        and the tier keeps its normal interval while the rest of the monitor backs off.
+        """
+        now = time.monotonic()
+        lapsed = not self._demanded(tier, now)
+        self._last_demand[tier] = now
+        if lapsed:
+            self._wake.set()
+
+    def request_processes(self):
+        self.request("processes")
+
+    def set_consumer_active(self, active: bool):
+        """Hint from the UI (e.g. dashboard tab hidden): back off immediately when inactive."""
+        if active:
+            self._touch(time.monotonic())
+        else:
+            self._last_read = 0.0
+            self._last_demand.clear()
+
+    def is_idle(self, now: Optional[float] = None) -> bool:
+        if self.feed.active:
+            return False
+        if now is None:
+            now = time.monotonic()
+        return now - self._last_read > self.idle_after
+
+    def _demanded(self, name: str, now: float) -> bool:
+        return now - self._last_demand.get(name, 0.0) <= self.idle_after
+
+    def _is_wanted(self, name: str, tier: SamplingTier, now: float) -> bool:
+        if not tier.on_demand or self.feed.wants(name):
+            return True
+        return self._demanded(name, now)
+
+    def subscribe(self, max_rate: float = 1.0, processes: bool = True, all_processes: bool = False):
+        """
+        Subscribe to coalesced deltas, delivered at most `max_rate` times/s:
+        'cpu', 'ram_percent', 'ram_used_human', 'total_threads' values and
+        changed/removed process rows keyed by PID (the top_k busiest, or every
+        process with all_processes=True). An active (unpaused)
+        subscription counts as a consumer, so sampling doesn't back off.
+        The first delta is a full snapshot.
+        """
+        wants = ()
+        if processes or all_processes:
+            wants = ("processes", "all_processes") if all_processes else ("processes",)
+        sub = self.feed.subscribe(max_rate, wants=wants)
+        self._wake.set()
+        return sub
+
+    def _feed_snapshot(self) -> Delta:
+        with self.lock:
+            rows = {p["pid"]: p for p in (self.all_processes or self.top_processes)}
+            self._published_rows = rows
+            return Delta(values={
+                'cpu': self.cpu_percent,
+                'ram_percent': self.ram_percent,
+                'ram_used_human': bytes_to_human(self.ram_used),
+                'total_threads': self.total_threads,
+            }, changed=dict(rows))
+
+    def _publish_rows(self, rows):
+        new = {p["pid"]: p for p in rows}
+        with self.lock:
+            old = self._published_rows
+            self._published_rows = new
+        changed = {pid: row for pid, row in new.items() if old.get(pid) != row}
+        removed = old.keys() - new.keys()
+        self.feed.publish(Delta(values={'total_threads': self.total_threads}, changed=changed, removed=removed))
+
+    # --- Sampling ---
+    def _sample(self, name: str, psutil):
+        if name == "cpu_ram":
+            cpu = psutil.cpu_percent(None)
+            mem = psutil.virtual_memory()
+            with self.lock:
+                self.cpu_percent = cpu
+                self.ram_total = mem.total
+                self.ram_percent = mem.percent
+                self.ram_used = mem.used
+            self.history.record_many({"cpu": cpu, "ram": mem.percent})
+            if self.feed.active:
+                self.feed.publish(Delta(values={
+                    'cpu': cpu, 'ram_percent': mem.percent, 'ram_used_human': bytes_to_human(mem.used)}))
+        elif name == "threads":
+            thread_count = count_threads()
+            if thread_count is None:
+                # No cheap source on this platform: fall back to a full scan
+                thread_count = self.scanner.scan()
+            with self.lock:
+                self.total_threads = thread_count
+            self.history.record("threads", thread_count)
+            if self.feed.active:
+                self.feed.publish(Delta(values={'total_threads': thread_count}))
+        elif name == "processes":
+            # Incremental scan, top-K via heap; thread totals come for free
+            thread_count = self.scanner.scan()
+            top_k = self.scanner.top(self.top_k)
+            everything = self.scanner.rows() if self.feed.wants("all_processes") else []
+            with self.lock:
+                self.total_threads = thread_count
+                self.top_processes = top_k
+                self.all_processes = everything
+            self.history.record("threads", thread_count)
+            if self.feed.active:
+                self._publish_rows(everything or top_k)
+        elif name == "engine":
+            self._sample_engine()
+        elif name == "workers":
+            self._sample_workers()
+
+    def _sample_engine(self):
+        # Never instantiate the engine from here; just observe it if it exists
+        from src.core.engine import peek_engine
+        engine = peek_engine()
+        if engine is None:
+            return
+        now = time.monotonic()
+        stats = engine.get_stats()
+        completed = stats["total_completed"]
+        values = {"queue_depth": stats["pending_tasks"]}
+        if self._engine_completed is not None:
+            prev_t, prev_completed = self._engine_completed
+            if now > prev_t:
+                values["throughput"] = max(0, completed - prev_completed) / (now - prev_t)
+        self._engine_completed = (now, completed)
+        self.history.record_many(values)
+
+    def _sample_workers(self):
+        from src.core.engine import peek_engine
+        engine = peek_engine()
+        if engine is None:
+            return
+        workers, pool = self.thread_sampler.sample(engine.get_worker_details())
+        with self.lock:
+            self.worker_cpu = workers
+            self.worker_pool = pool
+
     def _monitor_loop(self):
+        import psutil
+        psutil.cpu_percent(None)  # prime: the next call reports usage since now
+        self._started_at = time.monotonic()
+        thread_t0 = time.thread_time()
+        next_due = {name: 0.0 for name in self.tiers}
+
         while self.running:
-            try:
-                # 1. CPU & RAM (Fast)
-                cpu = psutil.cpu_percent(interval=0.5)
-                mem = psutil.virtual_memory()
-                
-                # 2. Total Threads (Slightly heavier, but okay)
-                # We can approximate this or fetch it less frequently if needed, 
-                # but psutil.pids() + loop is the only way to get EXACT total threads.
-                # Optimization: Just count processes for speed, or do a light scan.
-                # The user wants "Total Threads", which usually requires iterating all processes.
-                # To avoid high CPU, we might do this every other tick or just count processes if acceptable.
-                # However, prompt demanded "Efficient process scanning". 
-                # Let's do a full scan but optimized.
-                
-                thread_count = 0
-                procs = []
-                
-                # Iterate once for both threads count and top list
-                for p in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info', 'num_threads']):
+            self._wake.clear()
+            now = time.monotonic()
+            idle = self.is_idle(now)
+            wait = None
+            for name, tier in self.tiers.items():
+                if not self._is_wanted(name, tier, now):
+                    continue
+                # Back off only tiers nobody has asked for (e.g. a hidden tab's metrics)
+                scale = self.idle_backoff if idle and not self._demanded(name, now) else 1.0
+                if now >= next_due[name]:
+                    t0 = time.perf_counter()
                     try:
-                        # Some processes might vanish during iteration
-                        p_info = p.info
-                        if p_info['num_threads']:
-                            thread_count += p_info['num_threads']
-                        
-                        # Store for sorting
-                        # Calculate memory in MB for sorting
-                        mem_mb = (p_info['memory_info'].rss / 1024 / 1024)
-                        p_info['memory_mb'] = mem_mb
-                        procs.append(p_info)
-                        
-                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                        continue
-                
-                # Sort by CPU usage mainly, limit to top 50
-                procs.sort(key=lambda x: x['cpu_percent'], reverse=True)
-                top_50 = procs[:50]
-
-                with self.lock:
-                    self.cpu_percent = cpu
-                    self.ram_percent = mem.percent
-                    self.ram_used = mem.used
-                    self.total_threads = thread_count
-                    self.top_processes = top_50
-
-            except Exception as e:
-                print(f"Monitor Warning: {e}")
-                time.sleep(1)
-            
-            # Use interval inside cpu_percent, so no extra sleep needed here mostly, 
-            # but we loop slightly slower to save Battery/CPU
-            # cpu_percent(0.5) blocks for 0.5s, which constitutes our "sleep".
-    
-    def get_stats(self):
-        """Thread-safe getter for UI."""
+                        self._sample(name, psutil)
+                    except Exception as e:
+                        print(f"Monitor Warning: {e}")
+                    self._last_cost_ms[name] = (time.perf_counter() - t0) * 1000
+                    self._samples[name] += 1
+                    next_due[name] = now + tier.interval * scale
+                due_in = next_due[name] - now
+                wait = due_in if wait is None else min(wait, due_in)
+
+            self._cpu_used = time.thread_time() - thread_t0
+            # Sleep until the next tier is due, or until a consumer wakes us
+            self._wake.wait(wait)
+            if self._wake.is_set():
+                # Re-evaluate right away with the non-backed-off schedule (for tiers that get it)
+                now = time.monotonic()
+                idle = self.is_idle(now)
+                for name, tier in self.tiers.items():
+                    if not idle or self._demanded(name, now):
+                        next_due[name] = min(next_due[name], now + tier.interval)
+
+    def get_overhead(self) -> Dict:
+        """CPU consumed by the monitor thread itself."""
+        uptime = (time.monotonic() - self._started_at) if self._started_at else 0.0
+        return {
+            'cpu_seconds': round(self._cpu_used, 4),
+            'cpu_percent': round(100.0 * self._cpu_used / uptime, 3) if uptime > 0 else 0.0,
+            'idle': self.is_idle(),
+            'samples': dict(self._samples),
+            'last_cost_ms': {k: round(v, 3) for k, v in self._last_cost_ms.items()},
+        }
+
+    def get_worker_cpu(self):
+        """
+        Per-worker CPU attribution: ({worker_id: metrics}, pool_summary).
+        Metrics: cpu_percent, busy_percent, voluntary/involuntary_ctx_switches
+        (per sample interval, None where unsupported) and gil_wait_percent.
+        """
+        self.request("workers")
         with self.lock:
-            return {
+            return self.worker_cpu, self.worker_pool
+
+    def get_stats(self, include_processes: bool = True):
+        """Thread-safe getter for UI. Reading counts as consumer activity."""
+        self._touch(time.monotonic())
+        if include_processes:
+            self.request_processes()
+        with self.lock:
+            stats = {
                 'cpu': self.cpu_percent,
                 'ram_percent': self.ram_percent,
                 'ram_used_human': bytes_to_human(self.ram_used),
                 'total_threads': self.total_threads,
-                'processes': self.top_processes
+                'processes': self.top_processes if include_processes else [],
             }
+        stats['monitor'] = self.get_overhead()
+        return stats
+
+_monitor: Optional[SystemMonitor] = None
+_monitor_lock = threading.Lock()
+
+def get_monitor() -> SystemMonitor:
+    """Returns the shared monitor, creating it on first use."""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = SystemMonitor()
+    return _monitor
 
-sys_monitor = SystemMonitor()
+def __getattr__(name):
+    # Backwards compatibility: `from src.core.monitor import sys_monitor`
+    if name == "sys_monitor":
+        return get_monitor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
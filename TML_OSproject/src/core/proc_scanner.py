@@ -0,0 +1,182 @@
+import os
+import time
+import heapq
+from typing import Dict, List, Optional
+
+# Incremental process scanner.
+# State is kept per PID across ticks so CPU % is a real delta between two
+# samples of the same process. On Linux only /proc/<pid>/stat is read (one
+# syscall round-trip per process); elsewhere persistent psutil.Process objects
+# are reused so psutil's own cpu_percent() deltas stay valid.
+
+PROC_ROOT = "/proc"
+_STAT_UTIME = 11      # field 14, counted from the state field after "(comm)"
+_STAT_STIME = 12      # field 15
+_STAT_THREADS = 17    # field 20
+_STAT_STARTTIME = 19  # field 22
+_STAT_RSS = 21        # field 24 (pages)
+_COMM_MAX = 15        # kernel truncates comm to TASK_COMM_LEN - 1
+
+
+class _ProcState:
+    __slots__ = ("pid", "name", "start", "ticks", "cpu_percent", "rss", "num_threads", "handle")
+
+    def __init__(self, pid, name, start, handle=None):
+        self.pid = pid
+        self.name = name
+        self.start = start
+        self.ticks = None
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.num_threads = 0
+        self.handle = handle  # psutil.Process on the fallback path
+
+    def as_row(self) -> Dict:
+        # Rounded to display precision so unchanged rows compare equal between ticks
+        return {
+            "pid": self.pid,
+            "name": self.name,
+            "cpu_percent": round(self.cpu_percent, 1),
+            "memory_mb": round(self.rss / 1024 / 1024, 1),
+            "num_threads": self.num_threads,
+        }
+
+
+def count_threads() -> Optional[int]:
+    """System-wide thread count from /proc/loadavg (O(1)); None if unavailable."""
+    try:
+        # "0.00 0.01 0.05 1/73 2240" -> 73 scheduling entities (threads)
+        return int(read_proc_file(f"{PROC_ROOT}/loadavg").split()[3].split(b"/")[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def read_proc_file(path: str) -> bytes:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, 4096)
+    finally:
+        os.close(fd)
+
+
+class ProcessScanner:
+    """Keeps per-PID state between scans and selects the top-K by CPU with a heap."""
+
+    def __init__(self, use_procfs: Optional[bool] = None):
+        if use_procfs is None:
+            use_procfs = os.path.isdir(os.path.join(PROC_ROOT, "self", "task"))
+        self.use_procfs = use_procfs
+        self.procs: Dict[int, _ProcState] = {}
+        self.total_threads = 0
+        self._last_scan = None
+        if use_procfs:
+            self._clk_tck = os.sysconf("SC_CLK_TCK")
+            self._page_size = os.sysconf("SC_PAGE_SIZE")
+
+    def scan(self) -> int:
+        """Refreshes every process and returns the system-wide thread count."""
+        now = time.monotonic()
+        elapsed = (now - self._last_scan) if self._last_scan is not None else 0.0
+        self._last_scan = now
+        if self.use_procfs:
+            self._scan_procfs(elapsed)
+        else:
+            self._scan_psutil()
+        return self.total_threads
+
+    def top(self, k: Optional[int] = 50) -> List[Dict]:
+        """Row dicts for the k busiest processes (all processes if k is None)."""
+        states = self.procs.values()
+        key = lambda s: s.cpu_percent
+        if k is None:
+            chosen = sorted(states, key=key, reverse=True)
+        else:
+            chosen = heapq.nlargest(k, states, key=key)
+        return [s.as_row() for s in chosen]
+
+    def rows(self) -> List[Dict]:
+        """Row dicts for every known process, unordered."""
+        return [s.as_row() for s in self.procs.values()]
+
+    def __len__(self):
+        return len(self.procs)
+
+    # --- Linux: /proc ---
+    def _list_pids(self):
+        return {int(d) for d in os.listdir(PROC_ROOT) if d.isdigit()}
+
+    def _scan_procfs(self, elapsed: float):
+        procs = self.procs
+        current = self._list_pids()
+        for pid in procs.keys() - current:
+            del procs[pid]
+
+        scale = 100.0 / (self._clk_tck * elapsed) if elapsed > 0 else 0.0
+        threads = 0
+        vanished = []
+        for pid in current:
+            try:
+                raw = read_proc_file(f"{PROC_ROOT}/{pid}/stat")
+            except OSError:
+                vanished.append(pid)  # exited between listdir and read
+                continue
+            rparen = raw.rfind(b")")
+            fields = raw[rparen + 2:].split()
+            start = int(fields[_STAT_STARTTIME])
+            ticks = int(fields[_STAT_UTIME]) + int(fields[_STAT_STIME])
+
+            st = procs.get(pid)
+            if st is None or st.start != start:
+                # New PID (or PID reuse): name is read once per process lifetime
+                st = _ProcState(pid, self._proc_name(pid, raw, rparen), start)
+                procs[pid] = st
+            elif st.ticks is not None:
+                st.cpu_percent = (ticks - st.ticks) * scale
+            st.ticks = ticks
+            st.rss = int(fields[_STAT_RSS]) * self._page_size
+            st.num_threads = int(fields[_STAT_THREADS])
+            threads += st.num_threads
+
+        for pid in vanished:
+            procs.pop(pid, None)
+        self.total_threads = threads
+
+    def _proc_name(self, pid: int, raw: bytes, rparen: int) -> str:
+        name = raw[raw.find(b"(") + 1:rparen].decode(errors="replace")
+        if len(name) >= _COMM_MAX:
+            # comm is truncated; recover the full name from argv[0] like psutil does
+            try:
+                argv0 = read_proc_file(f"{PROC_ROOT}/{pid}/cmdline").split(b"\0", 1)[0]
+                base = os.path.basename(argv0.decode(errors="replace"))
+                if base.startswith(name):
+                    name = base
+            except OSError:
+                pass
+        return name
+
+    # --- Fallback: psutil with persistent Process objects ---
+    def _scan_psutil(self):
+        import psutil
+
+        procs = self.procs
+        current = set(psutil.pids())
+        for pid in procs.keys() - current:
+            del procs[pid]
+
+        threads = 0
+        for pid in current:
+            st = procs.get(pid)
+            try:
+                if st is None:
+                    handle = psutil.Process(pid)
+                    st = _ProcState(pid, handle.name(), handle.create_time(), handle)
+                    procs[pid] = st
+                handle = st.handle
+                with handle.oneshot():
+                    st.cpu_percent = handle.cpu_percent(None)
+                    st.rss = handle.memory_info().rss
+                    st.num_threads = handle.num_threads()
+                threads += st.num_threads
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                procs.pop(pid, None)
+        self.total_threads = threads
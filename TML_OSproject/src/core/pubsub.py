@@ -0,0 +1,191 @@
+import time
+import queue
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Push-based change feed.
+# Publishers either push a Delta (publish) or just flag that something changed
+# (notify) and let the feed pull a Delta from `collect` at most once per
+# delivery interval. Each subscriber has its own coalescing buffer and a
+# thread-safe queue that never holds more than one Delta: while the consumer
+# hasn't drained the last one, newer changes are merged into the buffer instead.
+# With no subscribers nothing is computed, and an idle feed's thread sleeps.
+
+
+class Delta:
+    """
+    Coalescable change set.
+    - values:   latest scalar values (later wins)
+    - changed:  key -> row for rows that changed or appeared (later wins)
+    - removed:  keys of rows that disappeared
+    - counters: name -> increment since the previous delta (summed)
+    """
+    __slots__ = ("values", "changed", "removed", "counters")
+
+    def __init__(self, values=None, changed=None, removed=None, counters=None):
+        self.values: Dict = values or {}
+        self.changed: Dict = changed or {}
+        self.removed: set = set(removed or ())
+        self.counters: Dict = counters or {}
+
+    def merge(self, other: "Delta"):
+        self.values.update(other.values)
+        for key in other.removed:
+            self.changed.pop(key, None)
+            self.removed.add(key)
+        for key, row in other.changed.items():
+            self.removed.discard(key)
+            self.changed[key] = row
+        for name, inc in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + inc
+
+    def __bool__(self):
+        return bool(self.values or self.changed or self.removed or self.counters)
+
+    def __repr__(self):
+        return (f"Delta(values={self.values}, changed={len(self.changed)}, "
+                f"removed={len(self.removed)}, counters={self.counters})")
+
+
+class Subscription:
+    """Consumer handle. Drain `queue` (e.g. from the Tk loop) with poll()/drain()."""
+
+    def __init__(self, feed: "ChangeFeed", max_rate: float, wants: Iterable[str] = ()):
+        self.feed = feed
+        self.interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.wants = frozenset(wants)  # optional publisher-specific topics
+        self.queue: "queue.Queue[Delta]" = queue.Queue()
+        self.paused = False
+        self._pending = Delta()
+        self._last_sent = 0.0
+
+    def poll(self) -> Optional[Delta]:
+        """Next delivered Delta, or None. Never blocks."""
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def drain(self) -> Optional[Delta]:
+        """Everything delivered so far, merged into one Delta (or None)."""
+        out = None
+        while True:
+            d = self.poll()
+            if d is None:
+                return out
+            if out is None:
+                out = d
+            else:
+                out.merge(d)
+
+    def pause(self):
+        """Stop deliveries (e.g. tab hidden). Changes keep coalescing."""
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+        self.feed.notify()
+
+    def close(self):
+        self.feed.unsubscribe(self)
+
+
+class ChangeFeed:
+    def __init__(self, snapshot: Optional[Callable[[], Delta]] = None,
+                 collect: Optional[Callable[[], Optional[Delta]]] = None,
+                 name: str = "feed"):
+        self.snapshot = snapshot  # full state, seeds each new subscriber
+        self.collect = collect    # changes since last collect, pulled after notify()
+        self.name = name
+        self.lock = threading.Lock()
+        self.subscribers: List[Subscription] = []
+        self._wake = threading.Event()
+        self._dirty = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def active(self) -> bool:
+        """True if at least one subscriber is receiving. Publishers check this first."""
+        return any(not s.paused for s in self.subscribers)
+
+    @property
+    def subscribed(self) -> bool:
+        """True if anyone is subscribed, paused or not. Change tracking that must
+        survive a pause (so resume() catches up) checks this instead of `active`."""
+        return bool(self.subscribers)
+
+    def wants(self, topic: str) -> bool:
+        return any(not s.paused and topic in s.wants for s in self.subscribers)
+
+    def subscribe(self, max_rate: float = 10.0, wants: Iterable[str] = ()) -> Subscription:
+        sub = Subscription(self, max_rate, wants)
+        if self.snapshot is not None:
+            sub._pending.merge(self.snapshot())
+        with self.lock:
+            self.subscribers.append(sub)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._flush_loop, name=f"{self.name}-feed", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self.lock:
+            if sub in self.subscribers:
+                self.subscribers.remove(sub)
+
+    def publish(self, delta: Delta):
+        """Push a ready-made Delta to every subscriber (coalesced until delivery)."""
+        if delta:
+            self._merge(delta)
+            self._wake.set()
+
+    def _merge(self, delta: Delta):
+        with self.lock:
+            for sub in self.subscribers:
+                sub._pending.merge(delta)
+
+    def notify(self):
+        """Cheap 'something changed' signal; `collect` runs at the delivery rate."""
+        self._dirty = True
+        if not self._wake.is_set():
+            self._wake.set()
+
+    def _flush_loop(self):
+        timeout = None
+        while True:
+            self._wake.wait(timeout)
+
+            # Rate limit: don't collect/deliver before the earliest subscriber is due
+            with self.lock:
+                subs = [s for s in self.subscribers if not s.paused]
+            now = time.monotonic()
+            due = min((s._last_sent + s.interval for s in subs), default=now)
+            if due > now:
+                time.sleep(due - now)
+            self._wake.clear()
+
+            if self._dirty and self.collect is not None and subs:
+                self._dirty = False
+                delta = self.collect()
+                if delta:
+                    self._merge(delta)
+
+            # Deliver to every due subscriber whose queue is empty
+            now = time.monotonic()
+            timeout = None
+            with self.lock:
+                for sub in self.subscribers:
+                    if sub.paused or not sub._pending:
+                        continue
+                    wait = sub._last_sent + sub.interval - now
+                    if wait <= 0 and sub.queue.empty():
+                        sub.queue.put(sub._pending)
+                        sub._pending = Delta()
+                        sub._last_sent = now
+                    elif wait > 0:
+                        timeout = wait if timeout is None else min(timeout, wait)
+                    else:
+                        # Consumer still hasn't drained: retry at its delivery interval
+                        interval = max(sub.interval, 0.05)
+                        timeout = interval if timeout is None else min(timeout, interval)
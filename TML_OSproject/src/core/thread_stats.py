@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.core.proc_scanner import PROC_ROOT, read_proc_file, _STAT_UTIME, _STAT_STIME
+
+# Per-thread CPU attribution for engine workers.
+# Native thread ids (Worker.native_id) are sampled from /proc/self/task/<tid>
+# on Linux, or psutil.Process().threads() elsewhere, and mapped back to
+# Worker.worker_id. Each sample is a delta against the previous one.
+#
+# GIL contention estimate (heuristic): time a worker spends busy but off-CPU is
+# either blocking I/O or waiting for the GIL. The share we attribute to the GIL
+# is scaled by how saturated the GIL is, i.e. how close the pool's combined CPU
+# use is to one core. A pool of sleeping I/O tasks scores ~0; several CPU-bound
+# workers sharing one core score high. Free-threaded builds always report 0.
+
+_GIL_ENABLED = getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def _read_ctx_switches(tid: int) -> Tuple[Optional[int], Optional[int]]:
+    try:
+        raw = read_proc_file(f"{PROC_ROOT}/self/task/{tid}/status")
+    except OSError:
+        return None, None
+    voluntary = involuntary = None
+    for line in raw.splitlines():
+        if line.startswith(b"voluntary_ctxt_switches"):
+            voluntary = int(line.split()[1])
+        elif line.startswith(b"nonvoluntary_ctxt_switches"):
+            involuntary = int(line.split()[1])
+    return voluntary, involuntary
+
+
+class _ThreadState:
+    __slots__ = ("cpu", "busy", "voluntary", "involuntary")
+
+    def __init__(self, cpu, busy, voluntary, involuntary):
+        self.cpu = cpu
+        self.busy = busy
+        self.voluntary = voluntary
+        self.involuntary = involuntary
+
+
+class ThreadSampler:
+    """Samples CPU time and context switches of engine worker threads."""
+
+    def __init__(self, use_procfs: Optional[bool] = None):
+        if use_procfs is None:
+            use_procfs = os.path.isdir(os.path.join(PROC_ROOT, "self", "task"))
+        self.use_procfs = use_procfs
+        self._prev: Dict[int, _ThreadState] = {}  # keyed by native thread id
+        self._last_sample: Optional[float] = None
+        if use_procfs:
+            self._clk_tck = os.sysconf("SC_CLK_TCK")
+
+    def _cpu_times(self, tids) -> Dict[int, float]:
+        """CPU seconds (user + system) per native thread id."""
+        times = {}
+        if self.use_procfs:
+            for tid in tids:
+                try:
+                    raw = read_proc_file(f"{PROC_ROOT}/self/task/{tid}/stat")
+                except OSError:
+                    continue  # thread exited
+                fields = raw[raw.rfind(b")") + 2:].split()
+                times[tid] = (int(fields[_STAT_UTIME]) + int(fields[_STAT_STIME])) / self._clk_tck
+        else:
+            import psutil
+            wanted = set(tids)
+            for t in psutil.Process().threads():
+                if t.id in wanted:
+                    times[t.id] = t.user_time + t.system_time
+        return times
+
+    def sample(self, details: List[Dict]) -> Tuple[Dict[int, Dict], Dict]:
+        """
+        `details` is HPCThreadEngine.get_worker_details().
+        Returns ({worker_id: metrics}, pool_summary).
+        """
+        now = time.monotonic()
+        elapsed = (now - self._last_sample) if self._last_sample is not None else 0.0
+        self._last_sample = now
+
+        by_tid = {d["native_id"]: d for d in details if d.get("native_id")}
+        cpu_times = self._cpu_times(by_tid)
+
+        prev = self._prev
+        current: Dict[int, _ThreadState] = {}
+        raw = {}
+        for tid, d in by_tid.items():
+            if tid not in cpu_times:
+                continue
+            voluntary, involuntary = _read_ctx_switches(tid) if self.use_procfs else (None, None)
+            st = _ThreadState(cpu_times[tid], d["busy_time"], voluntary, involuntary)
+            current[tid] = st
+            old = prev.get(tid)
+            if old is None or elapsed <= 0:
+                continue
+            raw[d["id"]] = (
+                max(0.0, st.cpu - old.cpu),
+                max(0.0, st.busy - old.busy),
+                None if voluntary is None or old.voluntary is None else voluntary - old.voluntary,
+                None if involuntary is None or old.involuntary is None else involuntary - old.involuntary,
+            )
+        self._prev = current
+
+        if not raw:
+            return {}, {"cpu_cores": 0.0, "gil_contention": 0.0}
+
+        pool_cores = sum(cpu for cpu, _, _, _ in raw.values()) / elapsed
+        gil_share = min(1.0, pool_cores) if _GIL_ENABLED else 0.0
+
+        workers = {}
+        busy_total = waited_total = 0.0
+        for worker_id, (cpu, busy, vol, invol) in raw.items():
+            busy = min(busy, elapsed)
+            off_cpu = max(0.0, busy - cpu)
+            gil_wait = off_cpu * gil_share
+            busy_total += busy
+            waited_total += gil_wait
+            workers[worker_id] = {
+                "cpu_percent": 100.0 * cpu / elapsed,
+                "busy_percent": 100.0 * busy / elapsed,
+                "voluntary_ctx_switches": vol,
+                "involuntary_ctx_switches": invol,
+                "gil_wait_percent": 100.0 * gil_wait / busy if busy > 0 else 0.0,
+            }
+        summary = {
+            "cpu_cores": pool_cores,
+            "gil_contention": waited_total / busy_total if busy_total > 0 else 0.0,
+        }
+        return workers, summary
@@ -0,0 +1,226 @@
+import os
+import json
+import math
+import mmap
+import time
+import logging
+import threading
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Compact multi-resolution time-series store.
+# Every (series, level) pair is a fixed ring of buckets stored column-wise in one
+# flat buffer of doubles: key[N] | min[N] | max[N] | sum[N] | count[N].
+# A sample at time t lands in bucket k = floor(t / resolution), slot k % N.
+# The stored key tells whether a slot still holds bucket k, so the ring needs no
+# head pointer, memory is bounded, and a memory-mapped buffer survives restarts.
+
+DEFAULT_SERIES = ("cpu", "ram", "threads", "queue_depth", "throughput")
+# (resolution seconds, capacity in buckets): 1h of 1s, 24h of 10s, 7d of 1min
+DEFAULT_LEVELS = ((1.0, 3600), (10.0, 8640), (60.0, 10080))
+
+_COLS = 5  # key, min, max, sum, count
+_HEADER_SIZE = 4096
+_MAGIC = "TMLTS1"
+
+Point = Tuple[float, float, float, float]  # (bucket start time, min, max, avg)
+
+logger = logging.getLogger("HPCEngine")
+
+
+class TimeSeriesStore:
+    """Bounded ring-buffer history with 1s/10s/1min min/max/avg rollups."""
+
+    def __init__(self, series: Sequence[str] = DEFAULT_SERIES,
+                 levels: Sequence[Tuple[float, int]] = DEFAULT_LEVELS,
+                 path: Optional[str] = None, readonly: bool = False):
+        self.series = tuple(series)
+        self.levels = tuple((float(r), int(n)) for r, n in levels)
+        self.path = path
+        self.readonly = readonly
+        self.lock = threading.Lock()
+        self._mmap = None
+
+        # Offsets (in doubles) of each (series, level) block
+        self._offsets: Dict[Tuple[str, int], int] = {}
+        offset = 0
+        for name in self.series:
+            for li, (_, cap) in enumerate(self.levels):
+                self._offsets[(name, li)] = offset
+                offset += _COLS * cap
+        self._size = offset
+
+        self._view = None
+        if path:
+            self._buf = self._open_mmap(path)
+        else:
+            self._buf = array("d", [-1.0]) * self._size  # key -1 = empty slot
+
+    # --- Storage ---
+    def _layout(self) -> bytes:
+        layout = {"magic": _MAGIC, "series": list(self.series), "levels": [list(l) for l in self.levels]}
+        return json.dumps(layout).encode().ljust(_HEADER_SIZE, b" ")
+
+    @staticmethod
+    def read_layout(path: str) -> Tuple[Tuple[str, ...], Tuple[Tuple[float, int], ...]]:
+        """(series, levels) recorded in an existing history file's header."""
+        with open(path, "rb") as f:
+            raw = f.read(_HEADER_SIZE)
+        try:
+            layout = json.loads(raw.decode().strip())
+        except ValueError:
+            layout = None
+        if not isinstance(layout, dict) or layout.get("magic") != _MAGIC:
+            raise ValueError(f"{path} is not a history file")
+        return tuple(layout["series"]), tuple((float(r), int(n)) for r, n in layout["levels"])
+
+    @classmethod
+    def open_existing(cls, path: str) -> "TimeSeriesStore":
+        """Read-only view of an existing history file, using the layout stored in it."""
+        series, levels = cls.read_layout(path)
+        return cls(series=series, levels=levels, path=path, readonly=True)
+
+    def _open_mmap(self, path: str):
+        header = self._layout()
+        total = _HEADER_SIZE + 8 * self._size
+        fresh = not os.path.exists(path)
+        if fresh and self.readonly:
+            raise FileNotFoundError(f"No history file at {path}")
+        if not fresh:
+            # Never overwrite someone's history: a different layout is an error
+            series, levels = self.read_layout(path)
+            if (series, levels) != (self.series, self.levels) or os.path.getsize(path) != total:
+                raise ValueError(f"{path} holds a different history layout "
+                                 f"(series {list(series)}, levels {[list(l) for l in levels]}); refusing to overwrite it")
+        else:
+            with open(path, "wb") as f:
+                f.write(header)
+                f.truncate(total)
+        f = open(path, "rb" if self.readonly else "r+b")
+        try:
+            access = mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE
+            self._mmap = mmap.mmap(f.fileno(), total, access=access)
+        finally:
+            f.close()
+        self._view = memoryview(self._mmap)
+        buf = self._view[_HEADER_SIZE:].cast("d")
+        if fresh:
+            for name in self.series:
+                for li, (_, cap) in enumerate(self.levels):
+                    base = self._offsets[(name, li)]
+                    buf[base:base + cap] = array("d", [-1.0]) * cap  # key -1 = empty slot
+        return buf
+
+    def flush(self):
+        if self._mmap is not None and not self.readonly:
+            self._mmap.flush()
+
+    def close(self):
+        if self._mmap is not None:
+            self._buf.release()
+            self._view.release()
+            self._mmap.close()
+            self._mmap = None
+
+    # --- Writes ---
+    def record(self, name: str, value: float, t: Optional[float] = None):
+        """Adds one sample to every resolution level of `name`."""
+        if t is None:
+            t = time.time()
+        buf = self._buf
+        with self.lock:
+            for li, (res, cap) in enumerate(self.levels):
+                k = math.floor(t / res)
+                base = self._offsets[(name, li)]
+                slot = k % cap
+                if buf[base + slot] != k:
+                    buf[base + slot] = k
+                    buf[base + cap + slot] = value
+                    buf[base + 2 * cap + slot] = value
+                    buf[base + 3 * cap + slot] = value
+                    buf[base + 4 * cap + slot] = 1.0
+                else:
+                    if value < buf[base + cap + slot]:
+                        buf[base + cap + slot] = value
+                    if value > buf[base + 2 * cap + slot]:
+                        buf[base + 2 * cap + slot] = value
+                    buf[base + 3 * cap + slot] += value
+                    buf[base + 4 * cap + slot] += 1.0
+
+    def record_many(self, values: Dict[str, float], t: Optional[float] = None):
+        if t is None:
+            t = time.time()
+        for name, value in values.items():
+            self.record(name, value, t)
+
+    # --- Reads ---
+    def pick_level(self, start: float, end: Optional[float] = None, max_points: Optional[int] = None) -> int:
+        """Finest level that still covers `start` (and yields <= max_points buckets)."""
+        now = time.time()
+        if end is None:
+            end = now
+        for li, (res, cap) in enumerate(self.levels):
+            covers = now - start <= res * cap
+            small = max_points is None or (end - start) / res <= max_points
+            if covers and small:
+                return li
+        return len(self.levels) - 1
+
+    def query(self, name: str, start: float, end: Optional[float] = None,
+              resolution: Optional[float] = None, max_points: Optional[int] = None) -> List[Point]:
+        """Returns [(t, min, max, avg)] for buckets in [start, end], oldest first."""
+        if end is None:
+            end = time.time()
+        if resolution is None:
+            li = self.pick_level(start, end, max_points)
+        else:
+            li = [r for r, _ in self.levels].index(float(resolution))
+        res, cap = self.levels[li]
+        base = self._offsets[(name, li)]
+        buf = self._buf
+
+        k0 = math.floor(start / res)
+        k1 = math.floor(end / res)
+        k0 = max(k0, k1 - cap + 1)  # older buckets have been overwritten
+        out = []
+        with self.lock:
+            for k in range(k0, k1 + 1):
+                slot = k % cap
+                if buf[base + slot] == k:
+                    count = buf[base + 4 * cap + slot]
+                    out.append((k * res, buf[base + cap + slot], buf[base + 2 * cap + slot],
+                                buf[base + 3 * cap + slot] / count))
+        return out
+
+    def latest(self, name: str) -> Optional[Point]:
+        """Most recent finest-resolution bucket for `name`, if any."""
+        res, cap = self.levels[0]
+        points = self.query(name, time.time() - res * 2, resolution=res)
+        return points[-1] if points else None
+
+    @property
+    def nbytes(self) -> int:
+        return 8 * self._size
+
+
+_history: Optional[TimeSeriesStore] = None
+_history_lock = threading.Lock()
+
+def get_history(path: Optional[str] = None) -> TimeSeriesStore:
+    """
+    Returns the shared history store, creating it on first use.
+    Persistence is opt-in: pass `path` (or set TML_HISTORY_FILE) before the
+    first call to back the store with a memory-mapped file. A file with a
+    different layout is left untouched and history is kept in memory instead.
+    """
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                path = path or os.environ.get("TML_HISTORY_FILE")
+                try:
+                    _history = TimeSeriesStore(path=path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"History file not used: {e}")
+                    _history = TimeSeriesStore()
+    return _history
@@ -1,5 +1,6 @@
 import sys
 import os
+import logging
 
 # Ensure src is in path if run mainly
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -9,6 +10,7 @@ sys.path.append(parent_dir)
 from src.ui.app_window import AppWindow
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
     app = AppWindow()
     app.mainloop()
 
@@ -3,7 +3,7 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from src.ui.tabs.system_monitor import SystemMonitorTab
 from src.ui.tabs.hpc_engine import HPCEngineTab
-from src.core.monitor import sys_monitor
+from src.core.monitor import get_monitor
 import webbrowser
 
 class AppWindow(ttk.Window):
@@ -41,6 +41,7 @@ class AppWindow(ttk.Window):
         
         self.notebook.add(self.tab1, text="System Dashboard")
         self.notebook.add(self.tab2, text="HPC Cluster Engine")
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         
         # Status Bar
         self.status_bar = ttk.Label(self, text="Ready", bootstyle="secondary", padding=5, font=("Helvetica", 8))
@@ -59,7 +60,12 @@ class AppWindow(ttk.Window):
         else:
             style.theme_use("superhero") # System/Default default
 
+    def on_tab_changed(self, event):
+        # Let the monitor back off as soon as the dashboard is hidden
+        visible = self.notebook.select() == str(self.tab1)
+        get_monitor().set_consumer_active(visible)
+
     def on_close(self):
-        sys_monitor.stop()
+        get_monitor().stop()
         self.destroy()
 
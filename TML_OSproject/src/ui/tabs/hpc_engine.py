@@ -1,13 +1,19 @@
+import threading
 import tkinter as tk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-import math
-from src.core.engine import hpc_engine, Priority
+from src.core.engine import get_engine, Priority
+from src.core.monitor import get_monitor
+from src.ui.widgets.cluster_view import ClusterView, MODES, STATE_NAMES
+from src.ui.widgets.graph import GraphWidget
+from src.core.loadgen import LoadGenerator, TaskClass, ServiceTime, sweep
 
 class HPCEngineTab(ttk.Frame):
     def __init__(self, master):
         super().__init__(master, padding=10)
         self.pack(fill=BOTH, expand=YES)
+        self.engine = get_engine()
+        self.monitor = get_monitor()
         
         # --- Top Control Panel ---
         self.control_frame = ttk.Labelframe(self, text="HPC Controls", padding=10, bootstyle="secondary")
@@ -21,7 +27,7 @@ class HPCEngineTab(ttk.Frame):
         self.btn_sub_worker = ttk.Button(self.scale_frame, text="-", width=2, command=self.remove_worker, bootstyle="warning-outline")
         self.btn_sub_worker.pack(side=LEFT, padx=2)
         
-        n_workers = hpc_engine.num_workers
+        n_workers = self.engine.num_workers
         self.worker_count_label = ttk.Label(self.scale_frame, text=str(n_workers), width=3, anchor=CENTER)
         self.worker_count_label.pack(side=LEFT, padx=2)
         
@@ -59,6 +65,34 @@ class HPCEngineTab(ttk.Frame):
         self.btn_cancel = ttk.Button(self.q_frame, text="Clear Queue", command=self.clear_queue, bootstyle="secondary-outline")
         self.btn_cancel.pack(side=LEFT, padx=2)
         
+        # --- Load Test (open-loop arrivals using the Task Type / Priority above) ---
+        self.load_frame = ttk.Labelframe(self, text="Load Test", padding=10, bootstyle="secondary")
+        self.load_frame.pack(fill=X, pady=(0, 10))
+
+        ttk.Label(self.load_frame, text="Arrivals:").pack(side=LEFT)
+        self.arrival_var = tk.StringVar(value="poisson")
+        ttk.Combobox(self.load_frame, textvariable=self.arrival_var, values=["constant", "poisson"], width=8, state="readonly").pack(side=LEFT, padx=2)
+
+        ttk.Label(self.load_frame, text="Rate/s:").pack(side=LEFT, padx=(5, 0))
+        self.rate_var = tk.DoubleVar(value=20.0)
+        ttk.Spinbox(self.load_frame, textvariable=self.rate_var, from_=1, to=10000, increment=10, width=6).pack(side=LEFT, padx=2)
+
+        ttk.Label(self.load_frame, text="Service (ms):").pack(side=LEFT, padx=(5, 0))
+        self.service_var = tk.DoubleVar(value=50.0)
+        ttk.Spinbox(self.load_frame, textvariable=self.service_var, from_=1, to=10000, increment=10, width=6).pack(side=LEFT, padx=2)
+
+        ttk.Label(self.load_frame, text="Duration (s):").pack(side=LEFT, padx=(5, 0))
+        self.duration_var = tk.DoubleVar(value=10.0)
+        ttk.Spinbox(self.load_frame, textvariable=self.duration_var, from_=1, to=600, increment=5, width=5).pack(side=LEFT, padx=2)
+
+        self.btn_load = ttk.Button(self.load_frame, text="Run", command=self.toggle_load, bootstyle="primary")
+        self.btn_load.pack(side=LEFT, padx=5)
+        self.btn_sweep = ttk.Button(self.load_frame, text="Sweep x1-x8", command=self.start_sweep, bootstyle="primary-outline")
+        self.btn_sweep.pack(side=LEFT, padx=2)
+
+        self.lbl_load = ttk.Label(self.load_frame, text="", bootstyle="secondary")
+        self.lbl_load.pack(side=LEFT, padx=10)
+
         # --- Stats Bar ---
         self.stats_frame = ttk.Frame(self)
         self.stats_frame.pack(fill=X, pady=(0, 5))
@@ -75,11 +109,26 @@ class HPCEngineTab(ttk.Frame):
         self.lbl_throughput = ttk.Label(self.stats_frame, text="Status: Ready", bootstyle="secondary")
         self.lbl_throughput.pack(side=RIGHT, padx=10)
 
+        # --- Queue / Throughput Chart (from the monitor's history store) ---
+        self.graph = GraphWidget(self, height=120, history_size=3600, span=600, y_range=10, title="Queue Depth / Throughput (tasks/s)")
+        self.graph.pack(fill=X, pady=(0, 5))
+        self.graph.add_series("queue_depth", label="Queue", color="#f39c12")
+        self.graph.add_series("throughput", label="Tasks/s", color="#2ecc71")
+
         # --- Visualization Area ---
         self.vis_frame = ttk.Labelframe(self, text="Cluster Visualization", padding=10)
         self.vis_frame.pack(fill=BOTH, expand=YES)
+
+        self.view_bar = ttk.Frame(self.vis_frame)
+        self.view_bar.pack(fill=X, pady=(0, 5))
+        ttk.Label(self.view_bar, text="View:").pack(side=LEFT)
+        self.mode_var = tk.StringVar(value="Auto")
+        self.mode_combo = ttk.Combobox(self.view_bar, textvariable=self.mode_var, values=MODES, width=10, state="readonly")
+        self.mode_combo.pack(side=LEFT, padx=2)
+        self.mode_combo.bind("<<ComboboxSelected>>", lambda e: self.canvas.set_mode(self.mode_var.get()))
         
-        self.canvas = tk.Canvas(self.vis_frame, bg="#1e1e1e", highlightthickness=0)
+        # Dirty-cell grid; switches to a heatmap for very large pools
+        self.canvas = ClusterView(self.vis_frame)
         self.canvas.pack(fill=BOTH, expand=YES)
         self.canvas.bind("<Motion>", self.on_mouse_move)
         
@@ -88,36 +137,44 @@ class HPCEngineTab(ttk.Frame):
         self.tooltip_visible = False
         
         # Internal State
-        self.rects = [] # List of IDs
-        self.worker_map = {} # Map ID -> Worker Index
         self.is_paused = False
+        self.load_gen = None
+        self.load_thread = None
+        self.sweep_results = []
+        self.sweep_saturation = None
+
+        # Pushed engine state (coalesced deltas, max 10/s) instead of polling
+        self.details = {} # worker id -> detail row
+        self.total_completed = 0
+        self.engine_sub = self.engine.subscribe(max_rate=10)
         
         # Initial Render
         self.update_grid()
         self.animate_loop()
+        self.update_chart()
 
     def add_worker(self):
-        hpc_engine.add_worker()
+        self.engine.add_worker()
         self.update_grid()
 
     def remove_worker(self):
-        hpc_engine.remove_worker()
+        self.engine.remove_worker()
         self.update_grid()
 
     def toggle_pause(self):
         if self.is_paused:
-            hpc_engine.resume_workload()
+            self.engine.resume_workload()
             self.btn_pause.configure(text="Pause", bootstyle="warning")
             self.lbl_throughput.configure(text="Status: Resumed")
             self.is_paused = False
         else:
-            hpc_engine.pause_workload()
+            self.engine.pause_workload()
             self.btn_pause.configure(text="Resume", bootstyle="success")
             self.lbl_throughput.configure(text="Status: PAUSED")
             self.is_paused = True
 
     def clear_queue(self):
-        hpc_engine.cancel_all_tasks()
+        self.engine.cancel_all_tasks()
         self.lbl_throughput.configure(text="Status: Queue Cleared")
 
     def fire_load(self):
@@ -128,120 +185,177 @@ class HPCEngineTab(ttk.Frame):
         prio = p_map.get(p_text, Priority.NORMAL)
         
         # Increased to 200 tasks to ensure visibility on 64-core view
-        hpc_engine.fire_workload(task_count=200, type=t_type, priority=prio)
+        self.engine.fire_workload(task_count=200, type=t_type, priority=prio)
 
-    def update_grid(self):
-        """Re-draws the grid squares."""
-        self.canvas.delete("worker") # clear rects
-        self.rects = []
-        self.worker_map = {}
-        
-        n_workers = hpc_engine.num_workers
+    # --- Load Test ---
+    def load_mix(self):
+        p_map = {"High": Priority.HIGH, "Normal": Priority.NORMAL, "Low": Priority.LOW}
+        service = ServiceTime("exp", self.service_var.get() / 1000.0)
+        return [TaskClass(type=self.type_var.get(), priority=p_map.get(self.prio_var.get(), Priority.NORMAL), service=service)]
+
+    def toggle_load(self):
+        if self.load_thread is not None and self.load_thread.is_alive():
+            if self.load_gen is not None:
+                self.load_gen.stop()
+            return
+        self.load_gen = LoadGenerator(self.engine, self.load_mix(), arrival=self.arrival_var.get(),
+                                      rate=self.rate_var.get(), duration=self.duration_var.get())
+        self.load_thread = self.load_gen.start()
+        self.btn_load.configure(text="Stop", bootstyle="danger")
+        self.btn_sweep.configure(state=DISABLED)
+        self.poll_load()
+
+    def start_sweep(self):
+        if self.load_thread is not None and self.load_thread.is_alive():
+            return
+        base = self.rate_var.get()
+        rates = [base * f for f in (1, 2, 4, 8)]
+        # Read Tk variables here, not in the worker thread
+        mix, arrival, duration = self.load_mix(), self.arrival_var.get(), self.duration_var.get()
+        self.load_gen = None
+        self.sweep_results = []
+        self.sweep_saturation = None
+
+        def run():
+            _, self.sweep_saturation = sweep(self.engine, mix, rates, arrival=arrival, duration=duration,
+                                             on_level=self.sweep_results.append)
+
+        self.load_thread = threading.Thread(target=run, name="loadgen-sweep", daemon=True)
+        self.load_thread.start()
+        self.btn_load.configure(state=DISABLED)
+        self.btn_sweep.configure(state=DISABLED)
+        self.poll_load()
+
+    @staticmethod
+    def format_load(r):
+        return (f"Offered {r.offered_rate:.0f}/s  Done {r.throughput:.0f}/s  "
+                f"p50 {r.p50_ms:.0f}ms  p95 {r.p95_ms:.0f}ms  p99 {r.p99_ms:.0f}ms")
+
+    def poll_load(self):
+        # The generator runs in its own thread; the UI only reads its counters
+        running = self.load_thread.is_alive()
+        if self.load_gen is not None:
+            if running:
+                done, submitted = self.load_gen.progress()
+                self.lbl_load.configure(text=f"Running: {done}/{submitted} done")
+            elif self.load_gen.result:
+                self.lbl_load.configure(text=self.format_load(self.load_gen.result))
+        elif self.sweep_results:
+            last = self.sweep_results[-1]
+            text = f"Level {len(self.sweep_results)}: {self.format_load(last)}"
+            if not running:
+                sat = self.sweep_saturation
+                text = f"Saturation: {sat:.0f}/s  ({self.format_load(last)})" if sat else f"No saturation up to {last.offered_rate:.0f}/s"
+            self.lbl_load.configure(text=text)
+
+        if running:
+            self.after(250, self.poll_load)
+        else:
+            self.btn_load.configure(text="Run", bootstyle="primary", state=NORMAL)
+            self.btn_sweep.configure(state=NORMAL)
+
+    def update_grid(self, n_workers=None):
+        """Resizes the grid to the pool size (only the difference is created/deleted)."""
+        if n_workers is None:
+            n_workers = self.engine.num_workers
         self.worker_count_label.configure(text=str(n_workers))
-        
-        if n_workers == 0: return
-
-        w = self.canvas.winfo_width()
-        h = self.canvas.winfo_height()
-        if w < 10: w = 800
-        if h < 10: h = 500
-        
-        cols = int(math.ceil(math.sqrt(n_workers * (w/h))))
-        if cols == 0: cols = 1
-        
-        cell_w = w / cols
-        cell_h = cell_w # make squares
-        
-        # If height overflow, shrink
-        if (n_workers // cols + 1) * cell_h > h:
-            cell_h = h / (n_workers // cols + 1)
-            cell_w = cell_h
-
-        for i in range(n_workers):
-            r = i // cols
-            c = i % cols
-            
-            x1 = c * cell_w + 2
-            y1 = r * cell_h + 2
-            x2 = x1 + cell_w - 4
-            y2 = y1 + cell_h - 4
-            
-            rect_id = self.canvas.create_rectangle(x1, y1, x2, y2, fill="#2ecc71", outline="", tags="worker")
-            self.rects.append(rect_id)
-            self.worker_map[rect_id] = i
+        self.canvas.resize(n_workers)
 
     def animate_loop(self):
-        # 1. Get States
-        stats = hpc_engine.get_stats()
-        details = hpc_engine.get_worker_details()
-        
-        # 2. Update Labels
-        self.lbl_pending.configure(text=f"Pending: {stats['pending_tasks']}")
-        self.lbl_active.configure(text=f"Running: {stats['active_workers']}")
-        self.lbl_completed.configure(text=f"Completed: {stats['total_completed']}")
-        
-        # 3. Update Visuals
-        # If count mismatch, rebuild grid (lazy dynamic scaling update)
-        if len(self.rects) != stats['total_workers']:
-            self.update_grid()
-            # If still mismatch (race condition), skip frame
-            if len(self.rects) != len(details):
-                 self.after(100, self.animate_loop)
-                 return
-
-        for i, rect_id in enumerate(self.rects):
-            if i >= len(details): break
-            
-            info = details[i]
-            if info['busy']:
-                color = "#e74c3c" # Red (Normal)
-                if info.get("priority") == Priority.HIGH:
-                    color = "#9b59b6" # Purple (High)
-                elif info.get("priority") == Priority.LOW:
-                    color = "#3498db" # Blue (Low)
-                elif info.get("current_task") == "IO":
-                    color = "#f39c12" # Orange (IO)
-                    
-                self.canvas.itemconfig(rect_id, fill=color)
-            else:
-                self.canvas.itemconfig(rect_id, fill="#2ecc71") # Green
-        
+        # Hidden tab: stop deliveries (changes keep coalescing in the feed)
+        if not self.winfo_ismapped():
+            if not self.engine_sub.paused:
+                self.engine_sub.pause()
+            self.after(500, self.animate_loop)
+            return
+        if self.engine_sub.paused:
+            self.engine_sub.resume()
+
+        delta = self.engine_sub.drain()
+        if delta is not None:
+            self.apply_delta(delta)
         self.after(100, self.animate_loop)
 
+    def update_chart(self):
+        if self.winfo_ismapped() and self.monitor.history is not None:
+            # Keeps the engine tier at its normal rate while the dashboard tab is backed off
+            self.monitor.request("engine")
+            self.graph.sync_history(self.monitor.history, ("queue_depth", "throughput"))
+        self.after(1000, self.update_chart)
+
+    def apply_delta(self, delta):
+        # 1. Labels (only what changed)
+        values = delta.values
+        if 'pending_tasks' in values:
+            self.lbl_pending.configure(text=f"Pending: {values['pending_tasks']}")
+        if 'active_workers' in values:
+            self.lbl_active.configure(text=f"Running: {values['active_workers']}")
+        if delta.counters.get('completed'):
+            self.total_completed += delta.counters['completed']
+            self.lbl_completed.configure(text=f"Completed: {self.total_completed}")
+
+        # 2. Worker rows
+        for wid in delta.removed:
+            self.details.pop(wid, None)
+        self.details.update(delta.changed)
+
+        # 3. Visuals: resize on pool size change, then redraw only changed cells
+        if len(self.canvas.states) != len(self.details):
+            self.update_grid(len(self.details))
+            for wid, info in self.details.items():
+                self.canvas.update_worker(wid, info)
+        else:
+            for wid, info in delta.changed.items():
+                self.canvas.update_worker(wid, info)
+        self.canvas.render()
+
+    def hide_tooltip(self):
+        if self.tooltip_visible:
+            self.tooltip.place_forget()
+            self.tooltip_visible = False
+
     def on_mouse_move(self, event):
-        try:
-            # Find item under mouse
-            x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
-            found = self.canvas.find_closest(x, y)
-            if not found:
-                if self.tooltip_visible:
-                    self.tooltip.place_forget()
-                    self.tooltip_visible = False
+        # Grid arithmetic instead of find_closest; text from pushed state (no engine lock)
+        hit = self.canvas.hit_test(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if hit is None:
+            self.hide_tooltip()
+            return
+
+        if hit[0] == "worker":
+            info = self.details.get(hit[1])
+            if info is None:
+                self.hide_tooltip()
                 return
-                
-            item = found[0]
-            idx = self.worker_map.get(item)
-            
-            if idx is not None:
-                # Show tooltip
-                details = hpc_engine.get_worker_details()
-                if idx < len(details):
-                    info = details[idx]
-                    status = "BUSY" if info['busy'] else "IDLE"
-                    text = f"Worker #{info['id']}\nStatus: {status}\nCompleted: {info['completed']}"
-                    if info['busy']:
-                        text += f"\nTask: {info['current_task']}"
-                        if info.get("priority") == Priority.HIGH:
-                            text += " (High Prio)"
-                    
-                    self.tooltip.configure(text=text)
-                    self.tooltip.place(x=event.x + 10, y=event.y + 10)
-                    self.tooltip_visible = True
-                    self.canvas.tag_raise(self.tooltip) # Ensure on top
-            else:
-                if self.tooltip_visible:
-                    self.tooltip.place_forget()
-                    self.tooltip_visible = False
-        except Exception:
-            # Fallback for any canvas weirdness
-            pass
+            text = self.worker_tooltip(info)
+        elif hit[0] == "bin":
+            first, last = hit[1], hit[2]
+            busy = self.canvas.bin_busy_count(first)
+            size = last - first + 1
+            text = f"Workers #{first}-#{last}\nBusy: {busy}/{size} ({100 * busy / size:.0f}%)"
+        else:
+            count = self.canvas.state_counts[hit[1]]
+            text = f"{STATE_NAMES[hit[1]]}: {count} workers"
+
+        if self.tooltip.cget("text") != text:
+            self.tooltip.configure(text=text)
+        self.tooltip.place(x=event.x + 10, y=event.y + 10)
+        self.tooltip_visible = True
+
+    def worker_tooltip(self, info):
+        status = "BUSY" if info['busy'] else "IDLE"
+        text = f"Worker #{info['id']}\nStatus: {status}\nCompleted: {info['completed']}"
+        if info['busy']:
+            text += f"\nTask: {info['current_task']}"
+            if info.get("priority") == Priority.HIGH:
+                text += " (High Prio)"
+
+        # Per-thread CPU attribution (sampled by the monitor)
+        cpu_info, pool = self.monitor.get_worker_cpu()
+        cpu = cpu_info.get(info['id'])
+        if cpu:
+            text += f"\nCPU: {cpu['cpu_percent']:.0f}%  Busy: {cpu['busy_percent']:.0f}%"
+            if cpu['voluntary_ctx_switches'] is not None:
+                text += f"\nCtx Switches: {cpu['voluntary_ctx_switches']} vol / {cpu['involuntary_ctx_switches']} invol"
+            text += f"\nGIL Wait (est.): {cpu['gil_wait_percent']:.0f}%"
+            text += f"\nPool: {pool['cpu_cores']:.2f} cores, GIL contention {pool['gil_contention'] * 100:.0f}%"
+        return text
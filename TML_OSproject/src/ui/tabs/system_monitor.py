@@ -1,12 +1,15 @@
 import tkinter as tk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from src.core.monitor import sys_monitor
+from src.core.monitor import get_monitor
+from src.ui.widgets.process_table import ProcessTable
+from src.ui.widgets.graph import GraphWidget
 
 class SystemMonitorTab(ttk.Frame):
     def __init__(self, master):
         super().__init__(master, padding=10)
         self.pack(fill=BOTH, expand=YES)
+        self.monitor = get_monitor()
         
         # --- Top Section: Statistics ---
         self.stats_frame = ttk.Frame(self)
@@ -50,55 +53,72 @@ class SystemMonitorTab(ttk.Frame):
         self.thread_sub = ttk.Label(self.thread_frame, text="Total Active Threads")
         self.thread_sub.pack(side=BOTTOM)
 
+        # --- History Chart (CPU & RAM on shared axes, last 10 minutes) ---
+        self.graph = GraphWidget(self, height=140, history_size=3600, span=600, title="CPU / RAM % (10 min)")
+        self.graph.pack(fill=X, pady=(0, 10))
+        self.graph.add_series("cpu", label="CPU", color="#3498db")
+        self.graph.add_series("ram", label="RAM", color="#f39c12")
+
         # --- Bottom Section: Process List ---
-        self.proc_frame = ttk.Labelframe(self, text="Top Processes (Active)", padding=10)
+        self.proc_frame = ttk.Labelframe(self, text="Processes", padding=10)
         self.proc_frame.pack(fill=BOTH, expand=YES)
 
-        # Columns
-        cols = ("PID", "Name", "CPU %", "RAM (MB)", "Threads")
-        self.tree = ttk.Treeview(self.proc_frame, columns=cols, show="headings", height=10, bootstyle="primary")
-        
-        for col in cols:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100, anchor=CENTER)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(self.proc_frame, orient=VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        
-        self.tree.pack(side=LEFT, fill=BOTH, expand=YES)
-        scrollbar.pack(side=RIGHT, fill=Y)
+        # Filter (applied on the data model, not the widget)
+        self.filter_frame = ttk.Frame(self.proc_frame)
+        self.filter_frame.pack(fill=X, pady=(0, 5))
+        ttk.Label(self.filter_frame, text="Filter (name / PID):").pack(side=LEFT)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", lambda *_: self.table.set_filter(self.filter_var.get()))
+        ttk.Entry(self.filter_frame, textvariable=self.filter_var, width=30).pack(side=LEFT, padx=5)
+        self.count_label = ttk.Label(self.filter_frame, text="0 processes", bootstyle="secondary")
+        self.count_label.pack(side=RIGHT)
+
+        # Virtualized table: all processes, only visible rows exist as Treeview items
+        self.table = ProcessTable(self.proc_frame)
+        self.table.pack(fill=BOTH, expand=YES)
 
         # --- Start Update Loop ---
         self.start_monitoring()
 
     def start_monitoring(self):
         # Start the backend monitor
-        sys_monitor.start()
+        self.monitor.start()
+        # Pushed deltas (max 1/s); the Tk loop only drains the subscription queue
+        self.sub = self.monitor.subscribe(max_rate=1.0, all_processes=True)
         self.update_ui()
+        self.update_chart()
 
     def update_ui(self):
-        # Fetch stats non-blocking
-        stats = sys_monitor.get_stats()
-        
-        # Update Meters
-        self.cpu_bar.configure(amountused=int(stats['cpu']))
-        self.ram_bar.configure(amountused=int(stats['ram_percent']))
-        self.thread_label.config(text=str(stats['total_threads']))
-        
-        # Update Tree
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Re-populate (Top 50)
-        for p in stats['processes']:
-            self.tree.insert("", END, values=(
-                p['pid'],
-                p['name'],
-                f"{p['cpu_percent']:.1f}",
-                f"{p['memory_mb']:.1f}",
-                p.get('num_threads', 0)
-            ))
-            
-        # Schedule next update
-        self.after(1000, self.update_ui)
+        # Hidden tab / minimized window: pause the subscription so the monitor backs off
+        if not self.winfo_ismapped():
+            if not self.sub.paused:
+                self.sub.pause()
+            self.after(1000, self.update_ui)
+            return
+        if self.sub.paused:
+            self.sub.resume()
+
+        delta = self.sub.drain()
+        if delta is not None:
+            self.apply_delta(delta)
+        self.after(250, self.update_ui)
+
+    def update_chart(self):
+        # Reads the monitor's history store (only buckets newer than the last drawn one)
+        if self.winfo_ismapped() and self.monitor.history is not None:
+            self.graph.sync_history(self.monitor.history, ("cpu", "ram"))
+        self.after(1000, self.update_chart)
+
+    def apply_delta(self, delta):
+        # Update Meters (only values that changed)
+        values = delta.values
+        if 'cpu' in values:
+            self.cpu_bar.configure(amountused=int(values['cpu']))
+        if 'ram_percent' in values:
+            self.ram_bar.configure(amountused=int(values['ram_percent']))
+        if 'total_threads' in values:
+            self.thread_label.config(text=str(values['total_threads']))
+
+        if delta.changed or delta.removed:
+            self.table.apply(delta)
+            self.count_label.configure(text=f"{len(self.table.model.rows)} processes")
@@ -0,0 +1,251 @@
+import tkinter as tk
+import math
+from src.core.engine import Priority
+
+# Scalable worker-grid canvas.
+# - Cells mode: one rectangle per worker. Only cells whose state changed are
+#   recolored, and only if the color actually differs from what is drawn.
+# - Heatmap mode: workers are grouped into at most MAX_BINS cells, each colored
+#   by the busy fraction of its group (green -> red). Used automatically above
+#   HEATMAP_THRESHOLD workers.
+# - Histogram mode: one bar per worker state (Idle / Normal / High / Low / IO).
+# Layout changes move existing rectangles with coords() and only create/delete
+# the difference; hit-testing is plain grid arithmetic (no find_closest).
+
+IDLE, NORMAL, HIGH, LOW, IO = range(5)
+STATE_NAMES = ("Idle", "Normal", "High", "Low", "IO")
+STATE_COLORS = ("#2ecc71", "#e74c3c", "#9b59b6", "#3498db", "#f39c12")
+
+HEATMAP_THRESHOLD = 1024
+MAX_BINS = 512
+HEAT_LEVELS = 10  # busy fraction is quantized so colors repeat and diffs stay cheap
+MODES = ("Auto", "Cells", "Heatmap", "Histogram")
+
+
+def worker_state(info):
+    if not info['busy']:
+        return IDLE
+    if info.get("priority") == Priority.HIGH:
+        return HIGH
+    if info.get("priority") == Priority.LOW:
+        return LOW
+    if info.get("current_task") == "IO":
+        return IO
+    return NORMAL
+
+
+def _blend(c1, c2, t):
+    a = [int(c1[i:i + 2], 16) for i in (1, 3, 5)]
+    b = [int(c2[i:i + 2], 16) for i in (1, 3, 5)]
+    return "#%02x%02x%02x" % tuple(int(x + (y - x) * t) for x, y in zip(a, b))
+
+
+HEAT_COLORS = tuple(_blend(STATE_COLORS[IDLE], STATE_COLORS[NORMAL], i / HEAT_LEVELS) for i in range(HEAT_LEVELS + 1))
+
+
+class ClusterView(tk.Canvas):
+    def __init__(self, master, **kwargs):
+        kwargs.setdefault("bg", "#1e1e1e")
+        kwargs.setdefault("highlightthickness", 0)
+        super().__init__(master, **kwargs)
+        self.requested_mode = "Auto"
+        self.mode = "Cells"
+
+        # Worker state
+        self.states = []          # per worker: IDLE..IO
+        self.state_counts = [0] * len(STATE_NAMES)
+
+        # Heatmap aggregation
+        self.bin_size = 1
+        self.bin_busy = []        # busy workers per bin
+
+        # Drawn cells
+        self.rects = []           # canvas item per cell (worker or bin)
+        self.colors = []          # fill currently drawn per cell
+        self.dirty = set()        # cells to recolor on next render()
+        self.geometry = None      # (cols, cell_w, cell_h)
+
+        # Histogram items
+        self.bars = []
+        self.bar_labels = []
+
+        self.bind("<Configure>", lambda e: self.layout())
+
+    # --- Model updates ---
+    def set_mode(self, mode):
+        self.requested_mode = mode
+        self._resolve_mode(force=True)
+
+    def _resolve_mode(self, force=False):
+        mode = self.requested_mode
+        if mode == "Auto":
+            mode = "Heatmap" if len(self.states) > HEATMAP_THRESHOLD else "Cells"
+        if mode != self.mode or force:
+            self.mode = mode
+            self._rebin()
+            self.layout(rebuild=True)
+
+    def resize(self, count):
+        """Pool size changed: extend/truncate state, then re-layout."""
+        if count == len(self.states):
+            return
+        for s in self.states[count:]:
+            self.state_counts[s] -= 1
+        del self.states[count:]
+        added = count - len(self.states)
+        if added > 0:
+            self.states.extend([IDLE] * added)
+            self.state_counts[IDLE] += added
+        self._resolve_mode()
+        self._rebin()
+        if self.mode == "Heatmap":
+            self.dirty = set(range(len(self.bin_busy))) # bin boundaries may have moved
+        self.layout()
+
+    def update_worker(self, wid, info):
+        """Records a worker's new state; marks the affected cell dirty if it changed."""
+        if wid >= len(self.states):
+            return
+        new = worker_state(info)
+        old = self.states[wid]
+        if new == old:
+            return
+        self.states[wid] = new
+        self.state_counts[old] -= 1
+        self.state_counts[new] += 1
+        if self.mode == "Cells":
+            self.dirty.add(wid)
+        elif self.mode == "Heatmap":
+            b = wid // self.bin_size
+            self.bin_busy[b] += (new != IDLE) - (old != IDLE)
+            self.dirty.add(b)
+
+    def _rebin(self):
+        n = len(self.states)
+        self.bin_size = max(1, math.ceil(n / MAX_BINS))
+        self.bin_busy = [0] * math.ceil(n / self.bin_size) if n else []
+        for wid, s in enumerate(self.states):
+            if s != IDLE:
+                self.bin_busy[wid // self.bin_size] += 1
+
+    # --- Layout ---
+    def cell_count(self):
+        if self.mode == "Cells":
+            return len(self.states)
+        if self.mode == "Heatmap":
+            return len(self.bin_busy)
+        return 0
+
+    def _size(self):
+        w, h = self.winfo_width(), self.winfo_height()
+        if w < 10: w = 800
+        if h < 10: h = 500
+        return w, h
+
+    def layout(self, rebuild=False):
+        if rebuild:
+            self.delete("cell")
+            self.delete("hist")
+            self.rects, self.colors, self.bars, self.bar_labels = [], [], [], []
+            self.geometry = None
+        if self.mode == "Histogram":
+            self._layout_histogram()
+            return
+
+        n = self.cell_count()
+        w, h = self._size()
+        geometry = None
+        if n:
+            cols = max(1, int(math.ceil(math.sqrt(n * (w / h)))))
+            cell_w = w / cols
+            cell_h = cell_w # make squares
+            rows = math.ceil(n / cols)
+            if rows * cell_h > h: # If height overflow, shrink
+                cell_h = cell_w = h / rows
+            geometry = (cols, cell_w, cell_h)
+
+        # Reposition existing cells only if the grid geometry changed
+        if geometry != self.geometry:
+            self.geometry = geometry
+            for i, rect in enumerate(self.rects[:n]):
+                self.coords(rect, *self._cell_box(i))
+        # Create / delete only the difference
+        for i in range(len(self.rects), n):
+            self.rects.append(self.create_rectangle(*self._cell_box(i), fill="", outline="", tags="cell"))
+            self.colors.append(None)
+            self.dirty.add(i)
+        while len(self.rects) > n:
+            self.delete(self.rects.pop())
+            self.colors.pop()
+        self.dirty = {i for i in self.dirty if i < n}
+        self.render()
+
+    def _cell_box(self, i):
+        cols, cell_w, cell_h = self.geometry
+        pad = 2 if cell_w > 6 else 0
+        x1 = (i % cols) * cell_w + pad
+        y1 = (i // cols) * cell_h + pad
+        return x1, y1, x1 + cell_w - 2 * pad, y1 + cell_h - 2 * pad
+
+    def _layout_histogram(self):
+        if not self.bars:
+            for name, color in zip(STATE_NAMES, STATE_COLORS):
+                self.bars.append(self.create_rectangle(0, 0, 0, 0, fill=color, outline="", tags="hist"))
+                self.bar_labels.append(self.create_text(0, 0, text="", fill="#bbb", font=("Helvetica", 9), tags="hist"))
+        self.render()
+
+    # --- Rendering ---
+    def _cell_color(self, i):
+        if self.mode == "Cells":
+            return STATE_COLORS[self.states[i]]
+        size = min(self.bin_size, len(self.states) - i * self.bin_size)
+        return HEAT_COLORS[round(HEAT_LEVELS * self.bin_busy[i] / size)]
+
+    def render(self):
+        """Flushes dirty cells; a cell is only reconfigured if its color changed."""
+        if self.mode == "Histogram":
+            self._render_histogram()
+            return
+        for i in self.dirty:
+            color = self._cell_color(i)
+            if self.colors[i] != color:
+                self.colors[i] = color
+                self.itemconfig(self.rects[i], fill=color)
+        self.dirty.clear()
+
+    def _render_histogram(self):
+        w, h = self._size()
+        total = max(1, len(self.states))
+        slot = w / len(self.bars)
+        base = h - 20
+        for i, (bar, label) in enumerate(zip(self.bars, self.bar_labels)):
+            count = self.state_counts[i]
+            top = base - (base - 20) * count / total
+            x1 = i * slot + slot * 0.2
+            self.coords(bar, x1, top, x1 + slot * 0.6, base)
+            self.coords(label, x1 + slot * 0.3, base + 10)
+            self.itemconfig(label, text=f"{STATE_NAMES[i]}: {count} ({100 * count / total:.0f}%)")
+
+    # --- Hit testing (O(1)) ---
+    def hit_test(self, x, y):
+        """Returns ('worker', id), ('bin', first_id, last_id), ('state', idx) or None."""
+        w, h = self._size()
+        if self.mode == "Histogram":
+            i = int(x // (w / len(STATE_NAMES)))
+            return ("state", i) if 0 <= i < len(STATE_NAMES) else None
+        if not self.geometry:
+            return None
+        cols, cell_w, cell_h = self.geometry
+        c, r = int(x // cell_w), int(y // cell_h)
+        if c < 0 or c >= cols or r < 0:
+            return None
+        i = r * cols + c
+        if i >= self.cell_count():
+            return None
+        if self.mode == "Cells":
+            return ("worker", i)
+        first = i * self.bin_size
+        return ("bin", first, min(len(self.states), first + self.bin_size) - 1)
+
+    def bin_busy_count(self, first):
+        return self.bin_busy[first // self.bin_size]
@@ -1,92 +1,242 @@
 import tkinter as tk
-import ttkbootstrap as ttk
+import time
 from collections import deque
 
+# Multi-series line chart on a shared time/value axis.
+# - Canvas items (grid, lines, labels) are created once and moved with
+#   coords()/itemconfig(); nothing is deleted and recreated per sample.
+# - Redraws are coalesced with after_idle, so a burst of samples costs one frame.
+# - Series longer than the pixel width are decimated per pixel column, keeping
+#   first/min/max/last of each column (M4), so spikes survive and a frame costs
+#   O(points) in Python but only O(width) in Tk.
+# - Points are (t, value) or (t, min, max, avg) as returned by
+#   TimeSeriesStore.query(); rolled-up buckets draw their min/max envelope.
+
+PALETTE = ("#00ff00", "#3498db", "#f39c12", "#e74c3c", "#9b59b6")
+
+
+def decimate(ts, lows, highs, t0, t1, width):
+    """
+    M4 decimation: reduces samples in [t0, t1] to at most 4 per pixel column.
+    Returns [(x, value)] with x in pixels.
+    """
+    out = []
+    if t1 <= t0:
+        return out
+    scale = width / (t1 - t0)
+    col = None
+    first = last = lo = hi = 0.0
+    lo_t = hi_t = 0.0
+    for t, a, b in zip(ts, lows, highs):
+        if t < t0:
+            continue
+        c = int((t - t0) * scale)
+        if c != col:
+            if col is not None:
+                _emit_column(out, col, first, lo, lo_t, hi, hi_t, last)
+            col = c
+            first, lo, hi = a, a, b
+            lo_t = hi_t = t
+        else:
+            if a < lo: lo, lo_t = a, t
+            if b > hi: hi, hi_t = b, t
+        last = a
+    if col is not None:
+        _emit_column(out, col, first, lo, lo_t, hi, hi_t, last)
+    return out
+
+
+def _emit_column(out, x, first, lo, lo_t, hi, hi_t, last):
+    # Order min/max by time so the polyline keeps the signal's direction
+    middle = (lo, hi) if lo_t <= hi_t else (hi, lo)
+    for v in (first,) + middle + (last,):
+        if not out or out[-1] != (x, v):
+            out.append((x, v))
+
+
+class _Series:
+    def __init__(self, name, label, color, maxlen):
+        self.name = name
+        self.label = label
+        self.color = color
+        self.ts = deque(maxlen=maxlen)
+        self.lows = deque(maxlen=maxlen)
+        self.highs = deque(maxlen=maxlen)
+        self.last = None
+        self.line = None
+        self.text = None
+        self.smooth = None
+
+
 class GraphWidget(tk.Canvas):
-    def __init__(self, master, width=400, height=200, history_size=60, title="Real-time Data", line_color="#00ff00", **kwargs):
+    def __init__(self, master, width=400, height=200, history_size=60, title="Real-time Data", line_color="#00ff00",
+                 span=None, y_range=100, **kwargs):
         super().__init__(master, width=width, height=height, bg="#111", highlightthickness=0, **kwargs)
         self.history_size = history_size
-        self.data = deque([0]*history_size, maxlen=history_size)
         self.line_color = line_color
         self.title_text = title
-        
+        self.span = span          # seconds shown (None = everything held)
+        self.y_range = y_range    # axis top unless data exceeds it
+        self.series = {}
+
         # Style
         self.grid_color = "#333"
         self.text_color = "#888"
-        
+        self.pad_top = 20
+        self.pad_bottom = 20
+
+        # Static items, positioned in draw_base()
+        self.grid_lines = [self.create_line(0, 0, 0, 0, fill=self.grid_color, tags="base", dash=(2, 4)) for _ in range(4)]
+        self.title_item = self.create_text(10, 10, text=self.title_text, fill=self.text_color, anchor="nw", font=("Helvetica", 10), tags="base")
+        self.scale_item = self.create_text(10, 26, text="", fill=self.text_color, anchor="nw", font=("Helvetica", 8), tags="base")
+        self._redraw_pending = False
+
         # Init
         self.bind("<Configure>", self.on_resize)
         self.draw_base()
 
-    def add_value(self, value):
+    # --- Data ---
+    def add_series(self, name, label=None, color=None, history_size=None):
+        """Adds a series sharing this graph's axes."""
+        if name not in self.series:
+            color = color or (self.line_color if not self.series else PALETTE[len(self.series) % len(PALETTE)])
+            s = _Series(name, label or name, color, history_size or self.history_size)
+            s.line = self.create_line(0, 0, 0, 0, fill=color, width=2, tags="line")
+            s.text = self.create_text(0, 0, text="", fill=color, anchor="ne", font=("Helvetica", 12, "bold"), tags="line")
+            self.series[name] = s
+        return self.series[name]
+
+    def add_value(self, value, series="default", t=None):
         """Adds a value (percentage 0-100 or raw with normalized scaling)."""
-        self.data.append(value)
-        self.redraw_line()
+        self.add_point(series, time.time() if t is None else t, value)
 
-    def draw_base(self):
-        self.delete("base")
+    def add_point(self, series, t, value, low=None, high=None):
+        """Appends a sample; a sample with the newest timestamp replaces it (bucket still filling)."""
+        s = self.series.get(series) or self.add_series(series)
+        low = value if low is None else low
+        high = value if high is None else high
+        if s.ts and t <= s.ts[-1]:
+            if t < s.ts[-1]:
+                return
+            s.lows[-1], s.highs[-1] = low, high
+        else:
+            s.ts.append(t)
+            s.lows.append(low)
+            s.highs.append(high)
+        s.last = value
+        self.schedule_redraw()
+
+    def set_series(self, series, points):
+        """Replaces a series with [(t, value)] or [(t, min, max, avg)] points (e.g. from the history store)."""
+        s = self.series.get(series) or self.add_series(series)
+        s.ts.clear()
+        s.lows.clear()
+        s.highs.clear()
+        for p in points:
+            s.ts.append(p[0])
+            s.lows.append(p[1])
+            s.highs.append(p[2] if len(p) > 2 else p[1])
+        s.last = points[-1][-1] if points else None
+        self.schedule_redraw()
+
+    def sync_history(self, history, names, labels=None):
+        """
+        Catches series up with a TimeSeriesStore: the first call loads `span`
+        seconds of history, later calls only read buckets newer than the last one drawn.
+        """
+        res = history.levels[0][0]
+        now = time.time()
+        for i, name in enumerate(names):
+            if name not in self.series:
+                self.add_series(name, label=labels[i] if labels else None)
+            since = self.latest_time(name)
+            if since is None:
+                since = now - (self.span or self.history_size * res)
+            for t, lo, hi, avg in history.query(name, since, now, resolution=res):
+                self.add_point(name, t, avg, lo, hi)
+
+    def latest_time(self, series):
+        s = self.series.get(series)
+        return s.ts[-1] if s and s.ts else None
+
+    # --- Drawing ---
+    def _size(self):
         w = self.winfo_width()
         h = self.winfo_height()
         if w < 10: w = int(self["width"])
         if h < 10: h = int(self["height"])
-        
+        return w, h
+
+    def draw_base(self):
+        w, h = self._size()
         # Grid lines (Horizontal)
-        for i in range(1, 5):
+        for i, line in enumerate(self.grid_lines, start=1):
             y = i * (h / 5)
-            self.create_line(0, y, w, y, fill=self.grid_color, tags="base", dash=(2, 4))
-            
-        # Title
-        self.create_text(10, 10, text=self.title_text, fill=self.text_color, anchor="nw", font=("Helvetica", 10), tags="base")
+            self.coords(line, 0, y, w, y)
+
+    def schedule_redraw(self):
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self.redraw_line)
 
     def redraw_line(self):
-        self.delete("line")
-        w = self.winfo_width()
-        h = self.winfo_height()
-        if w < 10: w = int(self["width"])
-        if h < 10: h = int(self["height"])
-        
-        # Padding
-        pad_bottom = 20
-        pad_top = 20
-        graph_h = h - pad_bottom - pad_top
-        
-        # Scale (Assuming 0-100 input for now, dynamic otherwise)
-        max_val = 100
-        # Dynamic max?
-        current_max = max(self.data)
-        if current_max > 100: max_val = current_max + 10
-        
-        if max_val == 0: max_val = 100
-
-        # Points
-        points = []
-        step_x = w / (self.history_size - 1)
-        
-        for i, val in enumerate(self.data):
-            x = i * step_x
-            # Y driven by value (0 at bottom, 100 at top)
-            # Invert Y: 0 -> h-pad, 100 -> pad_top
-            ratio = val / max_val
-            y = (h - pad_bottom) - (ratio * graph_h)
-            points.append(x)
-            points.append(y)
-            
-        if len(points) >= 4:
-            # Line
-            self.create_line(points, fill=self.line_color, width=2, tags="line", smooth=True)
-            
-            # Fill under line (Poly)
-            # Add bottom-right and bottom-left to close poly
-            poly_points = points + [w, h-pad_bottom, 0, h-pad_bottom]
-            # Tkinter doesn't support alpha on canvas items natively without PIL hacks.
-            # We skip transparent fill for simplicity/performance in pure Tk.
-            # Or use a stipple for 'fake' transparency?
-            # self.create_polygon(poly_points, fill=self.line_color, outline="", stipple="gray25", tags="line")
-
-        # Current Value Text
-        last_val = self.data[-1]
-        self.create_text(w-10, 10, text=f"{last_val:.1f}", fill=self.line_color, anchor="ne", font=("Helvetica", 12, "bold"), tags="line")
+        self._redraw_pending = False
+        w, h = self._size()
+        graph_h = h - self.pad_bottom - self.pad_top
+
+        # Shared time axis
+        live = [s for s in self.series.values() if s.ts]
+        if not live:
+            return
+        t1 = max(s.ts[-1] for s in live)
+        t0 = t1 - self.span if self.span else min(s.ts[0] for s in live)
+
+        # Decimate each series to the pixel width, then pick a shared scale
+        columns = {}
+        top = 0
+        for s in live:
+            if len(s.ts) > w:
+                pts = decimate(s.ts, s.lows, s.highs, t0, t1, w - 1)
+            else:
+                scale = (w - 1) / (t1 - t0) if t1 > t0 else 0
+                pts = []
+                for t, a, b in zip(s.ts, s.lows, s.highs):
+                    if t >= t0:
+                        x = (t - t0) * scale
+                        pts.append((x, a))
+                        if b != a:
+                            pts.append((x, b))
+            columns[s.name] = pts
+            if pts:
+                top = max(top, max(v for _, v in pts))
+
+        # Scale (y_range by default, dynamic if the data goes above it)
+        max_val = self.y_range or 100
+        if top > max_val: max_val = top * 1.1
+        self.itemconfig(self.scale_item, text=f"max {max_val:.0f}")
+
+        base = h - self.pad_bottom
+        for i, s in enumerate(self.series.values()):
+            pts = columns.get(s.name)
+            if pts and len(pts) >= 2:
+                coords = []
+                for x, v in pts:
+                    coords.append(x)
+                    coords.append(base - (v / max_val) * graph_h)
+                self.coords(s.line, *coords)
+                smooth = len(s.ts) <= w and len(pts) <= 120
+                if smooth != s.smooth:
+                    s.smooth = smooth
+                    self.itemconfig(s.line, smooth=smooth)
+            else:
+                self.coords(s.line, -10, -10, -10, -10)
+
+            # Current Value Text (stacked legend when there are several series)
+            if s.last is not None:
+                text = f"{s.last:.1f}" if len(self.series) == 1 else f"{s.label} {s.last:.1f}"
+                self.coords(s.text, w - 10, 10 + i * 16)
+                self.itemconfig(s.text, text=text)
 
     def on_resize(self, event):
         self.draw_base()
-        self.redraw_line()
+        self.schedule_redraw()
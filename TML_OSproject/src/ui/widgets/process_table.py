@@ -0,0 +1,232 @@
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+# Virtualized process table.
+# ProcessTableModel holds every row keyed by PID and does sorting/filtering in
+# plain Python. ProcessTable only owns as many Treeview items ("slots") as fit
+# on screen; scrolling moves an offset into the model's view and each refresh
+# rewrites just the cells whose text changed. Nothing is deleted/reinserted, so
+# selection and scroll position survive updates.
+
+COLUMNS = ("PID", "Name", "CPU %", "RAM (MB)", "Threads")
+SORT_KEYS = {
+    "PID": lambda r: r['pid'],
+    "Name": lambda r: r['name'].lower(),
+    "CPU %": lambda r: r['cpu_percent'],
+    "RAM (MB)": lambda r: r['memory_mb'],
+    "Threads": lambda r: r.get('num_threads', 0),
+}
+
+
+def format_row(r):
+    return (str(r['pid']), r['name'], f"{r['cpu_percent']:.1f}", f"{r['memory_mb']:.1f}", str(r.get('num_threads', 0)))
+
+
+class ProcessTableModel:
+    """Rows keyed by PID, with sorting and name/PID filtering done on the data."""
+
+    def __init__(self, sort_column="CPU %", descending=True):
+        self.rows = {}
+        self.sort_column = sort_column
+        self.descending = descending
+        self.filter_text = ""
+        self._view = []  # ordered, filtered PIDs
+        self._dirty = True
+
+    def apply(self, delta):
+        """Applies a monitor Delta (changed rows / removed PIDs)."""
+        if not delta.changed and not delta.removed:
+            return
+        for pid in delta.removed:
+            self.rows.pop(pid, None)
+        self.rows.update(delta.changed)
+        self._dirty = True
+
+    def set_sort(self, column):
+        """Sort by `column`; selecting the same column again flips the direction."""
+        if column == self.sort_column:
+            self.descending = not self.descending
+        else:
+            self.sort_column = column
+            self.descending = column in ("CPU %", "RAM (MB)", "Threads")
+        self._dirty = True
+
+    def set_filter(self, text):
+        text = text.strip().lower()
+        if text != self.filter_text:
+            self.filter_text = text
+            self._dirty = True
+
+    def _matches(self, r):
+        f = self.filter_text
+        return f in r['name'].lower() or str(r['pid']).startswith(f)
+
+    @property
+    def view(self):
+        if self._dirty:
+            rows = self.rows.values()
+            if self.filter_text:
+                rows = [r for r in rows if self._matches(r)]
+            key = SORT_KEYS[self.sort_column]
+            self._view = [r['pid'] for r in sorted(rows, key=key, reverse=self.descending)]
+            self._dirty = False
+        return self._view
+
+    def __len__(self):
+        return len(self.view)
+
+    def window(self, offset, count):
+        """Rows for the visible slice [offset, offset + count)."""
+        rows = self.rows
+        return [rows[pid] for pid in self.view[offset:offset + count]]
+
+
+class ProcessTable(ttk.Frame):
+    def __init__(self, master, model=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = model or ProcessTableModel()
+        self.offset = 0
+        self.selected_pid = None
+        self.slots = []        # Treeview item ids, one per visible row
+        self.slot_values = []  # last rendered text per slot (for cell diffs)
+        self.slot_pids = []
+
+        self.tree = ttk.Treeview(self, columns=COLUMNS, show="headings", bootstyle="primary", selectmode="browse")
+        for col in COLUMNS:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=100, anchor=CENTER)
+        self.tree.column("Name", width=200, anchor=W)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=VERTICAL, command=self.on_scrollbar)
+        self.tree.pack(side=LEFT, fill=BOTH, expand=YES)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+
+        self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<MouseWheel>", self.on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self.move_selection(1))
+
+    # --- Data ---
+    def apply(self, delta):
+        self.model.apply(delta)
+        self.refresh()
+
+    def set_filter(self, text):
+        self.model.set_filter(text)
+        self.offset = 0
+        self.refresh()
+
+    def sort_by(self, column):
+        self.model.set_sort(column)
+        for col in COLUMNS:
+            arrow = ""
+            if col == self.model.sort_column:
+                arrow = " ▼" if self.model.descending else " ▲"
+            self.tree.heading(col, text=col + arrow)
+        self.refresh()
+
+    # --- Virtual scrolling ---
+    def on_resize(self, event):
+        # One heading row, then as many slots as fit
+        count = max(1, event.height // self.row_height - 1)
+        if count != len(self.slots):
+            self.resize_slots(count)
+            self.refresh()
+
+    def resize_slots(self, count):
+        while len(self.slots) < count:
+            self.slots.append(self.tree.insert("", END, values=("",) * len(COLUMNS)))
+            self.slot_values.append(None)
+            self.slot_pids.append(None)
+        while len(self.slots) > count:
+            self.tree.delete(self.slots.pop())
+            self.slot_values.pop()
+            self.slot_pids.pop()
+
+    def max_offset(self):
+        return max(0, len(self.model) - len(self.slots))
+
+    def scroll_to(self, offset):
+        offset = min(max(0, int(offset)), self.max_offset())
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+        return "break"
+
+    def on_wheel(self, event):
+        return self.scroll_by(-3 if event.delta > 0 else 3)
+
+    def on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.scroll_to(float(args[0]) * len(self.model))
+        elif action == "scroll":
+            step = int(args[0]) * (len(self.slots) if args[1] == "pages" else 1)
+            self.scroll_by(step)
+
+    # --- Selection (tracked by PID, not by slot) ---
+    def on_select(self, event):
+        sel = self.tree.selection()
+        if sel and sel[0] in self.slots:
+            pid = self.slot_pids[self.slots.index(sel[0])]
+            if pid is not None:
+                self.selected_pid = pid
+
+    def move_selection(self, step):
+        view = self.model.view
+        if self.selected_pid not in self.model.rows or not view:
+            return "break"
+        index = min(max(0, view.index(self.selected_pid) + step), len(view) - 1)
+        self.selected_pid = view[index]
+        if index < self.offset:
+            self.scroll_to(index)
+        elif index >= self.offset + len(self.slots):
+            self.scroll_to(index - len(self.slots) + 1)
+        else:
+            self.refresh()
+        return "break"
+
+    # --- Rendering ---
+    def refresh(self):
+        self.offset = min(self.offset, self.max_offset())
+        rows = self.model.window(self.offset, len(self.slots))
+        selected_slot = None
+        for i, slot in enumerate(self.slots):
+            if i < len(rows):
+                values = format_row(rows[i])
+                self.slot_pids[i] = rows[i]['pid']
+                if rows[i]['pid'] == self.selected_pid:
+                    selected_slot = slot
+            else:
+                values = ("",) * len(COLUMNS)
+                self.slot_pids[i] = None
+            old = self.slot_values[i]
+            if old is None:
+                self.tree.item(slot, values=values)
+            elif old != values:
+                # Only touch the cells that changed
+                for col, new, prev in zip(COLUMNS, values, old):
+                    if new != prev:
+                        self.tree.set(slot, col, new)
+            self.slot_values[i] = values
+
+        current = self.tree.selection()
+        if selected_slot is not None:
+            if current != (selected_slot,):
+                self.tree.selection_set(selected_slot)
+        elif current:
+            self.tree.selection_remove(*current)
+
+        total = len(self.model)
+        if total:
+            first = self.offset / total
+            last = min(1.0, (self.offset + len(self.slots)) / total)
+        else:
+            first, last = 0.0, 1.0
+        self.scrollbar.set(first, last)
@@ -0,0 +1,26 @@
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.core.engine import HPCThreadEngine
+
+
+def test_removed_workers_finishing_tasks_are_counted():
+    # Soft-stopped workers still finish what they were running
+    engine = HPCThreadEngine(max_workers=2)
+    try:
+        engine.submit_task(time.sleep, 0.3)
+        engine.submit_task(time.sleep, 0.3)
+        time.sleep(0.1)
+        engine.resize_pool(0)
+        assert engine.wait_until_idle(timeout=10)
+        time.sleep(0.7)  # let the threads see the stop flag and exit
+        assert engine.retiring == []
+        assert engine.get_stats()["total_completed"] == 2
+        assert engine.get_latency_histograms()["run"].count == 2
+    finally:
+        engine.shutdown()
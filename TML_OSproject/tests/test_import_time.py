@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.cli import CORE_MODULES, IMPORT_BUDGET_MS
+
+# Imports the headless core in a fresh interpreter and reports what it cost
+# and what it pulled in / configured.
+PROBE = (
+    "import json, logging, sys, time\n"
+    "t = time.perf_counter()\n"
+    + "".join(f"import {m}\n" for m in CORE_MODULES)
+    + "ms = (time.perf_counter() - t) * 1000\n"
+    "print(json.dumps({'ms': ms, 'modules': sorted(sys.modules),\n"
+    "                  'root_handlers': len(logging.getLogger().handlers)}))\n"
+)
+
+
+def probe_import():
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def test_core_import_within_budget():
+    # Best of three to keep scheduler noise out of the measurement
+    best = min(probe_import()["ms"] for _ in range(3))
+    # Wall-clock budgets depend on the machine, so the gate is opt-in
+    if "TML_IMPORT_BUDGET_MS" not in os.environ:
+        pytest.skip(f"core import took {best:.1f}ms; set TML_IMPORT_BUDGET_MS to enforce a budget")
+    assert best <= IMPORT_BUDGET_MS, f"core import took {best:.1f}ms (budget {IMPORT_BUDGET_MS}ms)"
+
+
+def test_core_import_has_no_side_effects():
+    result = probe_import()
+    for heavy in ("psutil", "tkinter", "ttkbootstrap"):
+        assert heavy not in result["modules"], f"{heavy} imported at import time"
+    assert result["root_handlers"] == 0, "logging configured at import time"
@@ -0,0 +1,26 @@
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.core.engine import HPCThreadEngine
+from src.core.loadgen import simulated_task
+
+
+def test_cpu_tasks_serialize_on_the_gil():
+    # N concurrent CPU tasks burn N x service of CPU, so they can't finish
+    # much sooner than N x service of wall time
+    n, service = 4, 0.2
+    engine = HPCThreadEngine(max_workers=n)
+    try:
+        start = time.perf_counter()
+        for _ in range(n):
+            engine.submit_task(simulated_task, "CPU", service)
+        assert engine.wait_until_idle(timeout=30)
+        wall = time.perf_counter() - start
+    finally:
+        engine.shutdown()
+    assert wall >= 0.8 * n * service, f"{n} CPU tasks of {service}s took {wall:.2f}s"